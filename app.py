@@ -19,6 +19,9 @@ login_manager.login_view = 'auth.login'
 mail = Mail()
 csrf = CSRFProtect()
 
+# Database URIs whose schema was already created by this process
+_schema_ready = set()
+
 @login_manager.user_loader
 def load_user(user_id):
     try:
@@ -50,18 +53,10 @@ def create_app(config_class=Config):
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Ensure the instance folder exists
-    try:
-        os.makedirs(app.instance_path)
-    except OSError:
-        pass
-    
-    # Create upload folder if it doesn't exist
+    # Ensure the instance and upload folders exist
+    os.makedirs(app.instance_path, exist_ok=True)
     upload_path = os.path.join(app.root_path, app.config['UPLOAD_FOLDER'])
-    try:
-        os.makedirs(upload_path, exist_ok=True)
-    except OSError:
-        pass
+    os.makedirs(upload_path, exist_ok=True)
     
     # Initialize extensions
     db.init_app(app)
@@ -256,9 +251,17 @@ def create_app(config_class=Config):
                 
         return {'parse_emotions': parse_emotions, 'csrf_token': csrf_token, 'csp_nonce': csp_nonce}
     
-    # Create database tables
+    # Create database tables and pre-warm password hashing
     with app.app_context():
-        db.create_all()
+        # create_all inspects every table, so skip it when another app instance
+        # in this process already prepared the same persistent database
+        database_uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+        if database_uri not in _schema_ready:
+            db.create_all()
+            if database_uri not in ('sqlite://', 'sqlite:///:memory:'):
+                _schema_ready.add(database_uri)
+        from services.user_service import warm_password_hashing
+        warm_password_hashing()
     
     return app
 
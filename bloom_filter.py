@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Compact probabilistic set for very large password lists.
+
+A Bloom filter answers "definitely not present" or "probably present" using a
+fixed bit array, so a leaked-password list with millions of entries costs a
+few megabytes instead of a full Python set. Build the filter once at deploy
+time and load the saved file at startup:
+
+    python3 bloom_filter.py data/common_passwords.txt data/common_passwords.bloom
+"""
+
+import hashlib
+import math
+import struct
+import sys
+
+_HEADER = struct.Struct('<4sQI')  # magic, bit count, hash count
+_MAGIC = b'BLM1'
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Create an empty filter sized for the expected number of items.
+        
+        Args:
+            capacity (int): Expected number of items
+            error_rate (float): Target false-positive rate
+        """
+        capacity = max(capacity, 1)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+    
+    def _positions(self, item: str):
+        """Yield the bit positions for an item using double hashing."""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, item: str) -> None:
+        """Add an item to the filter."""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+    
+    def save(self, path: str) -> None:
+        """Write the filter to disk."""
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes))
+            f.write(self.bits)
+    
+    @classmethod
+    def load(cls, path: str) -> 'BloomFilter':
+        """Read a filter written by save()."""
+        with open(path, 'rb') as f:
+            magic, num_bits, num_hashes = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Not a Bloom filter file: {path}")
+            bloom = cls.__new__(cls)
+            bloom.num_bits = num_bits
+            bloom.num_hashes = num_hashes
+            bloom.bits = bytearray(f.read())
+        return bloom
+
+
+def build_from_wordlist(wordlist_path: str, error_rate: float = 0.001) -> BloomFilter:
+    """Build a filter from a newline-separated word list (entries are lower-cased)."""
+    with open(wordlist_path, encoding='utf-8', errors='ignore') as f:
+        capacity = sum(1 for line in f if line.strip())
+    
+    bloom = BloomFilter(capacity, error_rate)
+    with open(wordlist_path, encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            word = line.strip().lower()
+            if word:
+                bloom.add(word)
+    return bloom
+
+
+def main():
+    """Main entry point."""
+    if len(sys.argv) != 3:
+        print("Usage: python3 bloom_filter.py <wordlist.txt> <output.bloom>")
+        sys.exit(1)
+    
+    bloom = build_from_wordlist(sys.argv[1])
+    bloom.save(sys.argv[2])
+    print(f"Wrote {sys.argv[2]} ({len(bloom.bits) / (1024 * 1024):.1f} MB, {bloom.num_hashes} hashes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,39 @@ This should be run after any code changes to ensure the app is working.
 
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import time
 import sys
 
+APP_URL = 'https://127.0.0.1:5000'
+
+# Endpoints probed concurrently: root redirects to login or dashboard, and
+# /api/health checks the database and is exempt from rate limiting. /login and
+# /register are left out: their tight per-route rate limits count GETs too,
+# so repeated health checks would trip them.
+HEALTH_ENDPOINTS = ['/', '/api/health']
+
+# Unthrottled endpoint polled while waiting for a restarted app
+READY_ENDPOINT = '/api/health'
+
+# Statuses that mean the app is up. 429 is the rate limiter answering, which
+# needs a running app, so it must never trigger a restart.
+HEALTHY_STATUSES = {200, 302, 401, 429}
+
+def create_session():
+    """Create a keep-alive HTTP session shared by all app probes."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(HEALTH_ENDPOINTS))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': 'journal-health-check', 'Accept': 'text/html'})
+    session.verify = False
+    return session
+
+# Reused across checks so retries after a restart skip the TCP/TLS handshake
+SESSION = create_session()
+
 def check_service_status():
     """Check if the systemd service is running."""
     try:
@@ -52,19 +82,32 @@ def check_service_logs():
         print(f"❌ Error checking logs: {e}")
         return [f"Log check failed: {e}"]
 
-def check_app_response():
-    """Check if the app responds to HTTP requests."""
+def probe_endpoint(path, quiet=False):
+    """Fetch one endpoint and report whether it answered sensibly."""
     try:
-        # Try to connect to the app
-        response = requests.get('https://127.0.0.1:5000/', 
-                              timeout=10, verify=False)
-        
+        response = SESSION.get(f'{APP_URL}{path}', timeout=10, allow_redirects=False)
         # We expect a redirect for the root URL (to login or dashboard)
-        return response.status_code in [200, 302, 401]
+        return response.status_code in HEALTHY_STATUSES
     except Exception as e:
-        print(f"❌ Error checking app response: {e}")
+        if not quiet:
+            print(f"❌ Error checking {path}: {e}")
         return False
 
+def wait_for_app(timeout=15, interval=0.5):
+    """Poll until the app answers HTTP requests, instead of sleeping a fixed time."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if probe_endpoint(READY_ENDPOINT, quiet=True):
+            return True
+        time.sleep(interval)
+    return False
+
+def check_app_response():
+    """Check if the app responds to HTTP requests."""
+    # Probes overlap so the check costs one round trip rather than one per endpoint
+    with ThreadPoolExecutor(max_workers=len(HEALTH_ENDPOINTS)) as executor:
+        return all(executor.map(probe_endpoint, HEALTH_ENDPOINTS))
+
 def restart_service_if_needed():
     """Restart the service if it's not working."""
     try:
@@ -74,7 +117,8 @@ def restart_service_if_needed():
         
         if result.returncode == 0:
             print("✅ Service restarted successfully")
-            time.sleep(5)  # Wait for service to start
+            if not wait_for_app():
+                print("⚠️  Service did not answer HTTP requests within 15 seconds")
             return True
         else:
             print(f"❌ Service restart failed: {result.stderr}")
@@ -129,7 +173,6 @@ def main():
         
         # Try restart if not responding
         if restart_service_if_needed():
-            time.sleep(3)
             if check_app_response():
                 print("   ✅ App recovered after restart")
             else:
@@ -150,5 +193,8 @@ def main():
         return False
 
 if __name__ == "__main__":
-    success = main()
+    try:
+        success = main()
+    finally:
+        SESSION.close()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -4,6 +4,34 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+def load_common_passwords(path=None, bloom_path=None):
+    """Load the common-password list for O(1) membership checks.
+
+    A prebuilt Bloom filter (see bloom_filter.py) is used when present so very
+    large leaked-password lists stay small in memory; otherwise the plain word
+    list (one per line) is loaded into a frozenset.
+
+    Args:
+        path (str, optional): Word list to read. Defaults to data/common_passwords.txt.
+        bloom_path (str, optional): Prebuilt filter. Defaults to data/common_passwords.bloom.
+
+    Returns:
+        frozenset or BloomFilter: Lower-cased passwords supporting ``in``
+    """
+    bloom_path = bloom_path or os.path.join(DATA_DIR, 'common_passwords.bloom')
+    if os.path.exists(bloom_path):
+        from bloom_filter import BloomFilter
+        return BloomFilter.load(bloom_path)
+
+    path = path or os.path.join(DATA_DIR, 'common_passwords.txt')
+    with open(path, encoding='utf-8') as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+# Loaded once per process and shared by all password checks
+COMMON_PASSWORDS = load_common_passwords()
+
 class Config:
     """Base configuration class.""" 
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-change-in-production'
@@ -46,10 +74,7 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * MEGABYTE  # 16MB max upload size
     
     # Security settings
-    COMMON_PASSWORDS = {
-        'password', '123456', 'qwerty', 'admin', 'welcome', 'letmein', 'monkey',
-        'dragon', '111111', '123123', '654321', 'master', 'sunshine', '12345678',
-        'password123', 'abc123', 'football', 'baseball', 'princess', 'iloveyou',
-        'trustno1', 'superman', 'hello', 'charlie', 'freedom', 'whatever', 'asdfgh',
-        'zxcvbn', '1qaz2wsx', 'password1', 'temp123', 'passw0rd', '123qwe'
-    }
+    COMMON_PASSWORDS = COMMON_PASSWORDS
+    # Werkzeug hash method for new passwords, e.g. 'pbkdf2:sha256:600000'
+    # (see tune_password_hash.py); unset uses Werkzeug's default
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD')
@@ -8,17 +8,36 @@ This module provides functions for sending various types of emails including:
 from flask import current_app
 from flask_mail import Message, Mail
 from threading import Thread
+import time
+
+# Delivery attempts made by the background sender before giving up
+EMAIL_SEND_ATTEMPTS = 3
+# Base delay in seconds between attempts (doubled after each failure)
+EMAIL_RETRY_BACKOFF = 2
 
 def send_async_email(app, msg):
     """Send email asynchronously to avoid blocking the main thread.
     
+    Transient SMTP failures are retried with exponential backoff so they
+    stay isolated in the background thread instead of reaching the request.
+    
     Args:
         app: Flask application instance
         msg: Email message to send
     """
     with app.app_context():
-        mail = Mail(app)
-        mail.send(msg)
+        # Reuse the application's Mail extension instead of building one per send
+        mail = app.extensions.get('mail') or Mail(app)
+        for attempt in range(1, EMAIL_SEND_ATTEMPTS + 1):
+            try:
+                mail.send(msg)
+                return
+            except Exception as e:
+                if attempt == EMAIL_SEND_ATTEMPTS:
+                    app.logger.error(f"Failed to send email to {msg.recipients} after {attempt} attempts: {str(e)}")
+                    return
+                app.logger.warning(f"Email send attempt {attempt} failed, retrying: {str(e)}")
+                time.sleep(EMAIL_RETRY_BACKOFF * 2 ** (attempt - 1))
 
 def send_email(subject, recipients, text_body, html_body=None, sender=None):
     """Send an email using the configured mail server.
@@ -44,8 +63,8 @@ def send_email(subject, recipients, text_body, html_body=None, sender=None):
         sender=sender or default_sender
     )
     
-    # Send email asynchronously
-    Thread(target=send_async_email, args=(app, msg)).start()
+    # Send email asynchronously so SMTP latency never holds the request
+    Thread(target=send_async_email, args=(app, msg), daemon=True).start()
 
 def send_password_reset_email(user, token):
     """Send password reset email to a user.
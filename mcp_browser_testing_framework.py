@@ -25,9 +25,8 @@ import asyncio
 import json
 import logging
 import os
-import random
+import secrets
 import string
-import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
@@ -92,7 +91,7 @@ class MCPBrowserTestingFramework:
             # This would be replaced with actual MCP Task tool calls
             # For now, we'll simulate the structure
             result = {
-                "task_id": f"task_{int(time.time())}_{random.randint(1000, 9999)}",
+                "task_id": f"task_{secrets.token_hex(6)}",
                 "description": description,
                 "prompt": prompt,
                 "status": "completed",
@@ -112,7 +111,7 @@ class MCPBrowserTestingFramework:
         except Exception as e:
             self.logger.error(f"MCP Task failed: {description} - {str(e)}")
             return {
-                "task_id": f"task_{int(time.time())}_{random.randint(1000, 9999)}",
+                "task_id": f"task_{secrets.token_hex(6)}",
                 "description": description,
                 "status": "failed",
                 "error": str(e),
@@ -123,7 +122,7 @@ class MCPBrowserTestingFramework:
         """Execute an MCP WebFetch for browser testing"""
         try:
             result = {
-                "fetch_id": f"fetch_{int(time.time())}_{random.randint(1000, 9999)}",
+                "fetch_id": f"fetch_{secrets.token_hex(6)}",
                 "url": url,
                 "prompt": prompt,
                 "status": "completed",
@@ -142,7 +141,7 @@ class MCPBrowserTestingFramework:
         except Exception as e:
             self.logger.error(f"MCP WebFetch failed: {url} - {str(e)}")
             return {
-                "fetch_id": f"fetch_{int(time.time())}_{random.randint(1000, 9999)}",
+                "fetch_id": f"fetch_{secrets.token_hex(6)}",
                 "url": url,
                 "status": "failed",
                 "error": str(e),
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Add the locations.geohash column and its indexes to an existing database,
+then backfill geohashes for locations stored before the column existed.
+It also swaps the old case-sensitive location lookup index for the
+case-insensitive ix_locations_lookup.
+
+db.create_all() only creates missing tables, so databases created before the
+column was added need this run once. Safe to run again: every step checks
+what is already there.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app import create_app
+from models import db, Location, encode_geohash
+
+BATCH_SIZE = 500
+
+# Indexes an earlier version of the model declared that are no longer used
+OBSOLETE_INDEXES = ['ix_locations_name_city_state']
+
+
+def add_geohash_column():
+    """Add locations.geohash if the table predates it."""
+    columns = {column['name'] for column in inspect(db.engine).get_columns('locations')}
+    if 'geohash' in columns:
+        print("✅ locations.geohash already exists")
+        return
+    with db.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE locations ADD COLUMN geohash VARCHAR(12)"))
+    print("✅ Added locations.geohash")
+
+
+def create_location_indexes():
+    """Create the Location indexes declared on the model that are missing."""
+    existing = {index['name'] for index in inspect(db.engine).get_indexes('locations')}
+    for index in Location.__table__.indexes:
+        if index.name in existing:
+            continue
+        index.create(bind=db.engine)
+        print(f"✅ Created index {index.name}")
+
+
+def drop_obsolete_indexes():
+    """Drop Location indexes the model no longer declares."""
+    existing = {index['name'] for index in inspect(db.engine).get_indexes('locations')}
+    for name in OBSOLETE_INDEXES:
+        if name not in existing:
+            continue
+        with db.engine.begin() as connection:
+            connection.execute(text(f"DROP INDEX {name}"))
+        print(f"✅ Dropped index {name}")
+
+
+def backfill_geohashes():
+    """Fill in geohashes for located rows that have none. Returns the count."""
+    updated = 0
+    while True:
+        rows = db.session.query(Location.id, Location.latitude, Location.longitude).filter(
+            Location.geohash.is_(None),
+            Location.latitude.isnot(None),
+            Location.longitude.isnot(None)
+        ).limit(BATCH_SIZE).all()
+        if not rows:
+            break
+        # Bulk UPDATE by primary key; skips the ORM listener, which would
+        # compute the same value
+        db.session.bulk_update_mappings(Location, [
+            {'id': row.id, 'geohash': encode_geohash(row.latitude, row.longitude)}
+            for row in rows
+        ])
+        db.session.commit()
+        updated += len(rows)
+    return updated
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        add_geohash_column()
+        drop_obsolete_indexes()
+        create_location_indexes()
+        updated = backfill_geohashes()
+        print(f"✅ Backfilled geohash for {updated} locations")
+
+
+if __name__ == '__main__':
+    main()
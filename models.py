@@ -1,6 +1,10 @@
 from datetime import datetime, timedelta
+import hashlib
+import hmac
 import secrets
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, func
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
@@ -13,6 +17,77 @@ entry_tags = db.Table('entry_tags',
     db.Column('entry_id', db.Integer, db.ForeignKey('journal_entries.id'), primary_key=True)
 )
 
+_GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Precision stored on locations (~150m cells) and used for cache lookups (~5km cells)
+LOCATION_GEOHASH_PRECISION = 7
+GEOHASH_SEARCH_PRECISION = 5
+
+def encode_geohash(latitude, longitude, precision=LOCATION_GEOHASH_PRECISION):
+    """Encode coordinates as a geohash string; nearby points share a prefix."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    use_longitude = True
+    while len(chars) < precision:
+        coord_range = lon_range if use_longitude else lat_range
+        value = longitude if use_longitude else latitude
+        mid = (coord_range[0] + coord_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            coord_range[0] = mid
+        else:
+            bits <<= 1
+            coord_range[1] = mid
+        use_longitude = not use_longitude
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+def geohash_cells_for_box(min_lat, min_lon, max_lat, max_lon, precision=GEOHASH_SEARCH_PRECISION):
+    """Return the geohash cells a lat/lon box overlaps.
+
+    Only valid for boxes smaller than one cell: such a box spans at most two
+    cells each way, so the cells of its four corners cover all of it.
+    """
+    return sorted({
+        encode_geohash(lat, lon, precision)
+        for lat in (min_lat, max_lat)
+        for lon in (min_lon, max_lon)
+    })
+
+def geohash_prefix_end(prefix):
+    """Return the smallest geohash sorting after every geohash with this prefix.
+
+    Lets a prefix search run as a range (geohash >= prefix AND geohash < end),
+    which a plain btree index serves under any collation, unlike LIKE. Returns
+    None when the prefix is all 'z's and no upper bound is needed.
+    """
+    chars = list(prefix)
+    while chars:
+        last = _GEOHASH_BASE32.index(chars.pop())
+        if last + 1 < len(_GEOHASH_BASE32):
+            return ''.join(chars) + _GEOHASH_BASE32[last + 1]
+    return None
+
+def hash_token(token):
+    """Hash a single-use token for storage so the raw value never sits in the database."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def hash_password(password):
+    """Hash a password using the configured PASSWORD_HASH_METHOD, if any."""
+    method = None
+    if has_app_context():
+        method = current_app.config.get('PASSWORD_HASH_METHOD')
+    if method:
+        return generate_password_hash(password, method=method)
+    return generate_password_hash(password)
+
 class User(UserMixin, db.Model):
     """User model for authentication."""
     __tablename__ = 'users'
@@ -27,13 +102,13 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Reset password fields
-    reset_token = db.Column(db.String(100), nullable=True)
+    reset_token = db.Column(db.String(100), nullable=True)  # SHA-256 hash of the emailed token
     reset_token_expiry = db.Column(db.DateTime, nullable=True)
     
     # Email verification fields
     email_verification_token = db.Column(db.String(100), nullable=True)  # Token for email verification
     email_verification_expiry = db.Column(db.DateTime, nullable=True)  # Expiry for email verification
-    email_change_token = db.Column(db.String(100), nullable=True)
+    email_change_token = db.Column(db.String(100), nullable=True)  # SHA-256 hash of the emailed token
     email_change_token_expiry = db.Column(db.DateTime, nullable=True)
     new_email = db.Column(db.String(120), nullable=True)
     
@@ -50,7 +125,7 @@ class User(UserMixin, db.Model):
     
     def set_password(self, password):
         """Set password hash."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Check password hash."""
@@ -58,13 +133,15 @@ class User(UserMixin, db.Model):
     
     def generate_reset_token(self):
         """Generate a password reset token."""
-        self.reset_token = secrets.token_urlsafe(64)
+        token = secrets.token_urlsafe(64)
+        self.reset_token = hash_token(token)
         self.reset_token_expiry = datetime.utcnow() + timedelta(hours=24)
-        return self.reset_token
+        return token
     
     def verify_reset_token(self, token):
         """Verify that the reset token is valid."""
-        if (self.reset_token != token or 
+        if (not self.reset_token or 
+            not hmac.compare_digest(self.reset_token, hash_token(token)) or 
             self.reset_token_expiry is None or 
             datetime.utcnow() > self.reset_token_expiry):
             return False
@@ -78,13 +155,15 @@ class User(UserMixin, db.Model):
     def generate_email_change_token(self, new_email):
         """Generate a token for email change verification."""
         self.new_email = new_email
-        self.email_change_token = secrets.token_urlsafe(64)
+        token = secrets.token_urlsafe(64)
+        self.email_change_token = hash_token(token)
         self.email_change_token_expiry = datetime.utcnow() + timedelta(hours=24)
-        return self.email_change_token
+        return token
     
     def verify_email_change_token(self, token):
         """Verify that the email change token is valid."""
-        if (self.email_change_token != token or 
+        if (not self.email_change_token or 
+            not hmac.compare_digest(self.email_change_token, hash_token(token)) or 
             self.email_change_token_expiry is None or 
             datetime.utcnow() > self.email_change_token_expiry or
             self.new_email is None):
@@ -374,6 +453,7 @@ class Location(db.Model):
     country = db.Column(db.String(100), nullable=True)
     postal_code = db.Column(db.String(20), nullable=True)
     location_type = db.Column(db.String(50), default='manual')  # 'manual', 'gps', 'geocoded'
+    geohash = db.Column(db.String(12), nullable=True, index=True)  # Kept in sync with coordinates
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -426,6 +506,30 @@ class Location(db.Model):
         return None
 
 
+# Case-insensitive index for the manual-location lookup used when
+# de-duplicating form submissions. Not unique: GPS locations reverse-geocoded
+# to the same town, and locations the journal routes store from raw form JSON,
+# legitimately share a name, city and state.
+db.Index(
+    'ix_locations_lookup',
+    func.lower(Location.name),
+    func.lower(func.coalesce(Location.city, '')),
+    func.lower(func.coalesce(Location.state, '')),
+    postgresql_where=Location.name.isnot(None),
+    sqlite_where=Location.name.isnot(None)
+)
+
+
+@event.listens_for(Location, 'before_insert')
+@event.listens_for(Location, 'before_update')
+def _set_location_geohash(mapper, connection, location):
+    """Keep the indexed geohash column in sync with the coordinates."""
+    if location.latitude is not None and location.longitude is not None:
+        location.geohash = encode_geohash(location.latitude, location.longitude)
+    else:
+        location.geohash = None
+
+
 class WeatherData(db.Model):
     """Weather data model for storing weather information."""
     __tablename__ = 'weather_data'
@@ -460,6 +564,9 @@ class WeatherData(db.Model):
     
     # Relationships
     location = db.relationship('Location', backref='weather_records', lazy='joined')
+    # post_update breaks the insert cycle with JournalEntry.weather so both rows
+    # can be written in one flush
+    journal_entry = db.relationship('JournalEntry', foreign_keys=[journal_entry_id], post_update=True)
     
     def __repr__(self):
         return f'<WeatherData {self.weather_condition} at {self.temperature}°{self.temperature_unit[0].upper()}>'
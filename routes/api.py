@@ -1,13 +1,29 @@
 """API routes for templates, weather, and location services."""
 from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required, current_user
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
-from models import JournalTemplate, TemplateQuestion, Location
+from models import db, JournalTemplate, TemplateQuestion, Location
+from security import limiter
 from services.weather_service import weather_service
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 
+@api_bp.route('/health')
+@limiter.exempt
+def health():
+    """Report whether the app can reach its database (unthrottled, for health checks)"""
+    try:
+        db.session.execute(text('SELECT 1'))
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Health check database error: {e}")
+        return jsonify({'status': 'error', 'database': False}), 503
+    
+    return jsonify({'status': 'ok', 'database': True})
+
+
 @api_bp.route('/templates/<int:template_id>/questions')
 @login_required
 def get_template_questions(template_id):
@@ -7,6 +7,7 @@ from sqlalchemy.exc import SQLAlchemyError
 import pytz
 
 from models import db, User
+from config import COMMON_PASSWORDS
 from security import limiter
 from email_utils import send_email
 
@@ -73,8 +74,7 @@ def register():
                         return render_template('register.html', form=form, timezones=common_timezones)
                 
                 # Check for common passwords
-                common_passwords = ['password', '123456', 'qwerty', 'admin', 'welcome']
-                if password.lower() in common_passwords:
+                if password.lower() in COMMON_PASSWORDS:
                     flash('Please choose a stronger password.', 'danger')
                     return render_template('register.html', form=form, timezones=common_timezones)
                 
@@ -185,10 +185,10 @@ Thank you,
 @auth_bp.route('/login', methods=['GET', 'POST'])
 @limiter.limit("5 per minute")
 def login():
-    import time
     from validators import sanitize_text
     from two_factor import is_verification_required, send_verification_code
     from forms import LoginForm
+    from services.user_service import authenticate_user
     
     if current_user.is_authenticated:
         return redirect(url_for('journal.index'))
@@ -197,19 +197,15 @@ def login():
     
     if request.method == 'POST':
         if form.validate_on_submit():
-            # Add slight delay to prevent timing attacks
-            time.sleep(0.1)
-            
             # Get form data
             username = sanitize_text(form.username.data)
             password = form.password.data
             remember = form.remember.data
             
-            # Attempt to find the user
-            user = User.query.filter_by(username=username).first()
-            
-            # Check if user exists and password is correct
-            if not user or not user.check_password(password):
+            # Unknown usernames cost the same password hash as wrong passwords,
+            # so response time doesn't reveal which accounts exist
+            user = authenticate_user(username, password)
+            if not user:
                 current_app.logger.warning(f'Failed login attempt for user: {username} from IP: {request.remote_addr}')
                 flash('Invalid username or password.', 'danger')
                 return render_template('login.html', form=form)
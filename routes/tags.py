@@ -1,5 +1,5 @@
 """Tag management routes."""
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
 
 from models import db, Tag, entry_tags
@@ -23,4 +23,27 @@ def manage_tags():
             'entry_count': entry_count
         })
     
-    return render_template('journal/tags.html', tag_stats=tag_stats)
\ No newline at end of file
+    return render_template('journal/tags.html', tag_stats=tag_stats)
+
+
+@tag_bp.route('/tags/<int:tag_id>/delete', methods=['POST'])
+@login_required
+def delete_tag(tag_id):
+    """Delete a tag and remove it from all journal entries"""
+    tag = Tag.query.filter_by(id=tag_id, user_id=current_user.id).first_or_404()
+    
+    try:
+        # Drop the tag's associations in a single statement rather than
+        # loading every tagged entry and removing the tag one by one
+        db.session.execute(entry_tags.delete().where(entry_tags.c.tag_id == tag.id))
+        db.session.delete(tag)
+        db.session.commit()
+        
+        flash('Tag deleted successfully!', 'success')
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error deleting tag {tag_id}: {str(e)}")
+        flash('Error deleting tag. Please try again.', 'danger')
+    
+    return redirect(url_for('tag.manage_tags'))
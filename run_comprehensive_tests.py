@@ -11,18 +11,53 @@ This script runs all tests that would catch the types of issues we just fixed:
 import subprocess
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Suites sharing the test database must not overlap (fixtures drop tables on
+# teardown), so they run in order in one lane while static checks run alongside
+DATABASE_SUITES = [
+    ("python3 run_tests.py quick",
+     "Running basic unit tests"),
+    ("python3 -m pytest tests/unit/test_security_validation.py -v",
+     "Testing security validation (prevents false positives)"),
+    ("python3 -m pytest tests/unit/test_csp_javascript.py -v",
+     "Testing CSP nonces and JavaScript structure"),
+    ("python3 -m pytest tests/unit/test_journal_entries.py::TestGuidedJournalEntries::test_create_guided_entry_with_emotions_json -v",
+     "Testing guided journal form submission with emotions"),
+]
+
+STATIC_CHECKS = [
+    ("python3 validate_csrf.py",
+     "Validating CSRF tokens in templates"),
+    ("python3 -c \"import subprocess; subprocess.run(['hooks/pre-commit-comprehensive'], check=True)\"",
+     "Running comprehensive template validation"),
+]
+
+# Keeps output from concurrently running checks from interleaving
+_output_lock = threading.Lock()
+
 
 def run_command(cmd, description, critical=True):
     """Run a command and handle the result."""
-    print(f"🔍 {description}...")
+    with _output_lock:
+        print(f"🔍 {description}...")
     
     try:
         result = subprocess.run(
             cmd, shell=True, capture_output=True, text=True, timeout=300
         )
-        
+    except subprocess.TimeoutExpired:
+        with _output_lock:
+            print(f"⏰ {description} timed out!")
+        return False
+    except Exception as e:
+        with _output_lock:
+            print(f"💥 {description} crashed: {e}")
+        return False
+    
+    with _output_lock:
         if result.returncode == 0:
             print(f"✅ {description} passed!")
             return True
@@ -38,13 +73,11 @@ def run_command(cmd, description, critical=True):
             else:
                 print("⚠️  Non-critical failure, continuing...")
                 return True
-                
-    except subprocess.TimeoutExpired:
-        print(f"⏰ {description} timed out!")
-        return False
-    except Exception as e:
-        print(f"💥 {description} crashed: {e}")
-        return False
+
+
+def run_in_order(checks):
+    """Run checks one after another and return how many failed."""
+    return sum(1 for cmd, description in checks if not run_command(cmd, description))
 
 
 def main():
@@ -61,46 +94,31 @@ def main():
     # Change to project directory
     os.chdir(Path(__file__).parent)
     
-    failures = 0
-    
-    # 1. Basic unit tests
-    if not run_command(
-        "python3 run_tests.py quick", 
-        "Running basic unit tests"
-    ):
-        failures += 1
+    # The database lane and the static checks are independent, so they
+    # overlap instead of adding up
+    with ThreadPoolExecutor(max_workers=len(STATIC_CHECKS) + 1) as executor:
+        database_lane = executor.submit(run_in_order, DATABASE_SUITES)
+        static_results = list(executor.map(lambda check: run_command(*check), STATIC_CHECKS))
+        failures = database_lane.result() + static_results.count(False)
     
-    # 2. Security validation tests
-    if not run_command(
-        "python3 -m pytest tests/unit/test_security_validation.py -v",
-        "Testing security validation (prevents false positives)"
-    ):
-        failures += 1
-    
-    # 3. CSP/JavaScript tests  
-    if not run_command(
-        "python3 -m pytest tests/unit/test_csp_javascript.py -v",
-        "Testing CSP nonces and JavaScript structure"
-    ):
-        failures += 1
-    
-    # 4. CSRF validation
-    if not run_command(
-        "python3 validate_csrf.py",
-        "Validating CSRF tokens in templates"
-    ):
-        failures += 1
-    
-    # 5. End-to-end tests (if Selenium is available)
+    # End-to-end tests (if Selenium is available) use the test database too,
+    # so they start once the database lane has finished. They stay in a single
+    # pytest process: parallel workers would race on the shared database and
+    # each boot its own browsers instead of reusing the session BrowserPool.
     selenium_available = run_command(
         "python3 -c 'import selenium; print(\"Selenium available\")'",
         "Checking if Selenium is available",
         critical=False
     )
     
-    if selenium_available:
+    if failures:
+        # Browser runs are the slowest step and only add noise once the
+        # suites above have failed
+        print("ℹ️  Skipping browser tests (earlier checks failed)")
+    elif selenium_available:
+        # -x: each further browser test after a failure is mostly diagnostic noise
         if not run_command(
-            "python3 -m pytest tests/functional/test_guided_journal_e2e.py -v",
+            "python3 -m pytest tests/functional/test_guided_journal_e2e.py -v -x",
             "Running end-to-end browser tests",
             critical=False  # Browser tests can be flaky
         ):
@@ -108,20 +126,6 @@ def main():
     else:
         print("ℹ️  Skipping browser tests (Selenium not available)")
     
-    # 6. Template validation
-    if not run_command(
-        "python3 -c \"import subprocess; subprocess.run(['hooks/pre-commit-comprehensive'], check=True)\"",
-        "Running comprehensive template validation"
-    ):
-        failures += 1
-    
-    # 7. Integration test - simulate form submission
-    if not run_command(
-        "python3 -m pytest tests/unit/test_journal_entries.py::TestGuidedJournalEntries::test_create_guided_entry_with_emotions_json -v",
-        "Testing guided journal form submission with emotions"
-    ):
-        failures += 1
-    
     print("")
     print("=" * 50)
     
@@ -16,12 +16,19 @@ import asyncio
 import json
 import logging
 import os
+import secrets
 import sys
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Any
 
+try:
+    import orjson
+except ImportError:  # Optional; reports fall back to the stdlib encoder
+    orjson = None
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,6 +36,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def dump_report_json(report: Dict[str, Any]) -> bytes:
+    """Serialize a report as indented JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2)
+    return json.dumps(report, indent=2).encode('utf-8')
+
 class RealMCPTestExecutor:
     """Executes real MCP tests using the actual MCP tools"""
     
@@ -676,7 +689,7 @@ class RealMCPTestExecutor:
             # In real implementation: WebFetch(url=self.base_url, prompt=prompt)
             
             result = {
-                "test_id": f"webfetch_{int(time.time())}",
+                "test_id": f"webfetch_{secrets.token_hex(6)}",
                 "test_type": "webfetch",
                 "description": description,
                 "url": self.base_url,
@@ -699,7 +712,7 @@ class RealMCPTestExecutor:
         except Exception as e:
             logger.error(f"WebFetch test failed: {description} - {str(e)}")
             return {
-                "test_id": f"webfetch_{int(time.time())}",
+                "test_id": f"webfetch_{secrets.token_hex(6)}",
                 "test_type": "webfetch",
                 "description": description,
                 "status": "failed",
@@ -722,7 +735,7 @@ class RealMCPTestExecutor:
             # In real implementation: Task(description=description, prompt=prompt)
             
             result = {
-                "test_id": f"task_{int(time.time())}",
+                "test_id": f"task_{secrets.token_hex(6)}",
                 "test_type": "task",
                 "description": description,
                 "prompt": prompt,
@@ -744,7 +757,7 @@ class RealMCPTestExecutor:
         except Exception as e:
             logger.error(f"Task test failed: {description} - {str(e)}")
             return {
-                "test_id": f"task_{int(time.time())}",
+                "test_id": f"task_{secrets.token_hex(6)}",
                 "test_type": "task",
                 "description": description,
                 "status": "failed",
@@ -822,23 +835,24 @@ class RealMCPTestExecutor:
         
         # Save JSON report
         json_file = os.path.join(self.output_dir, f"mcp_test_report_{timestamp}.json")
-        with open(json_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        Path(json_file).write_bytes(dump_report_json(report))
         
         logger.info(f"Test report saved: {json_file}")
         
         # Save summary
         summary_file = os.path.join(self.output_dir, f"test_summary_{timestamp}.txt")
-        with open(summary_file, 'w') as f:
-            f.write("MCP Browser Testing Framework - Test Summary\n")
-            f.write("=" * 50 + "\n\n")
-            f.write(f"Test Session: {report['test_session']['timestamp']}\n")
-            f.write(f"Base URL: {report['test_session']['base_url']}\n")
-            f.write(f"Total Tests: {report['test_summary']['total_tests']}\n")
-            f.write(f"Passed: {report['test_summary']['passed_tests']}\n")
-            f.write(f"Failed: {report['test_summary']['failed_tests']}\n")
-            f.write(f"Pass Rate: {report['test_summary']['pass_rate']:.1f}%\n")
-            f.write(f"Security Status: {report['security_assessment']['overall_status']}\n")
+        summary = (
+            "MCP Browser Testing Framework - Test Summary\n"
+            f"{'=' * 50}\n\n"
+            f"Test Session: {report['test_session']['timestamp']}\n"
+            f"Base URL: {report['test_session']['base_url']}\n"
+            f"Total Tests: {report['test_summary']['total_tests']}\n"
+            f"Passed: {report['test_summary']['passed_tests']}\n"
+            f"Failed: {report['test_summary']['failed_tests']}\n"
+            f"Pass Rate: {report['test_summary']['pass_rate']:.1f}%\n"
+            f"Security Status: {report['security_assessment']['overall_status']}\n"
+        )
+        Path(summary_file).write_text(summary)
         
         logger.info(f"Summary saved: {summary_file}")
 
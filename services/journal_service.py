@@ -1,14 +1,63 @@
-from models import db, JournalEntry, Tag, Photo, GuidedResponse, ExerciseLog, Location, WeatherData
+from models import db, JournalEntry, Tag, Photo, GuidedResponse, ExerciseLog, Location, WeatherData, QuestionManager
 from validators import sanitize_journal_content, sanitize_tag_name, validate_color_hex
 from werkzeug.utils import secure_filename
 import json
 import uuid
 import os
-from flask import current_app
+from flask import current_app, g, has_request_context
 from datetime import datetime
+from sqlalchemy import func
 from time_utils import TimeUtils
 # allowed_file will be passed as parameter
 
+# Buffer size for streaming uploaded photos to disk (1 MB)
+PHOTO_COPY_BUFFER_SIZE = 1024 * 1024
+
+# Color given to new tags when none is provided (Bootstrap secondary)
+DEFAULT_TAG_COLOR = '#6c757d'
+
+
+def _get_user_tags(user_id):
+    """Get a user's tags keyed by ID, loaded once per request.
+    
+    Args:
+        user_id: ID of the user whose tags to load
+        
+    Returns:
+        Dictionary mapping tag ID to Tag
+    """
+    if not has_request_context():
+        return {tag.id: tag for tag in Tag.query.filter_by(user_id=user_id).all()}
+    
+    user_tags = g.setdefault('user_tags', {})
+    if user_id not in user_tags:
+        user_tags[user_id] = {tag.id: tag for tag in Tag.query.filter_by(user_id=user_id).all()}
+    return user_tags[user_id]
+
+
+def _select_user_tags(user_id, tag_ids):
+    """Resolve submitted tag IDs to the user's own tags.
+    
+    Args:
+        user_id: ID of the user whose tags may be selected
+        tag_ids: Submitted tag IDs; anything int() rejects is skipped
+        
+    Returns:
+        List of Tag, in submission order without duplicates
+    """
+    valid_tag_ids = []
+    for tag_id in tag_ids or []:
+        try:
+            valid_tag_ids.append(int(tag_id))
+        except (ValueError, TypeError):
+            # Skip invalid IDs
+            pass
+    if not valid_tag_ids:
+        return []
+    
+    user_tags = _get_user_tags(user_id)
+    return [user_tags[tag_id] for tag_id in dict.fromkeys(valid_tag_ids) if tag_id in user_tags]
+
 
 def _handle_location_and_weather(form_data):
     """Handle location and weather data from form submission.
@@ -17,10 +66,12 @@ def _handle_location_and_weather(form_data):
         form_data: Dictionary containing form data
         
     Returns:
-        Tuple of (location_id, weather_id) or (None, None) if no data
+        Tuple of (location, weather) objects or (None, None) if no data.
+        New objects are not added to the session; the caller adds them
+        together with the journal entry so everything is saved in one flush.
     """
-    location_id = None
-    weather_id = None
+    location_obj = None
+    weather_obj = None
     
     try:
         # Check if we have location data
@@ -74,22 +125,32 @@ def _handle_location_and_weather(form_data):
                     )
                 ).first()
             elif location.name:
-                # For manual locations, check by name
-                existing_location = Location.query.filter_by(
-                    name=location.name,
-                    city=location.city,
-                    state=location.state
-                ).first()
+                # For manual locations, check by name ignoring case (city/state
+                # only narrow the match when provided). The expressions match
+                # ix_locations_lookup so the lookup is an index seek.
+                query = Location.query.filter(
+                    func.lower(Location.name) == func.lower(location.name)
+                )
+                if location.city:
+                    query = query.filter(
+                        func.lower(func.coalesce(Location.city, '')) == func.lower(location.city)
+                    )
+                if location.state:
+                    query = query.filter(
+                        func.lower(func.coalesce(Location.state, '')) == func.lower(location.state)
+                    )
+                existing_location = query.first()
             
             if existing_location:
-                location_id = existing_location.id
+                location_obj = existing_location
                 # Update the existing location's updated_at timestamp
                 existing_location.updated_at = datetime.utcnow()
+            elif not any([location.name, location.city, location.address, location.latitude is not None]):
+                # Only whitespace was submitted - nothing worth storing
+                pass
             else:
-                # Save new location
-                db.session.add(location)
-                db.session.flush()  # Get ID without committing
-                location_id = location.id
+                # New location, saved along with the entry
+                location_obj = location
         
         # Check if we have weather data (either individual fields or valid JSON)
         weather_data_json = form_data.get('weather_data', '').strip()
@@ -123,7 +184,7 @@ def _handle_location_and_weather(form_data):
         if has_weather_data:
             # Create weather record
             weather = WeatherData()
-            weather.location_id = location_id
+            weather.location = location_obj
             
             # JSON data already parsed above, use it directly
             
@@ -164,16 +225,46 @@ def _handle_location_and_weather(form_data):
             
             weather.weather_source = 'manual'  # Default to manual for form entries
             
-            # Save weather record
-            db.session.add(weather)
-            db.session.flush()  # Get ID without committing
-            weather_id = weather.id
+            weather_obj = weather
     
     except Exception as e:
         current_app.logger.error(f"Error handling location/weather data: {e}")
         # Don't fail the entire entry creation for location/weather errors
         
-    return location_id, weather_id
+    return location_obj, weather_obj
+
+
+def _save_photo_stream(stream, photo_path, max_size):
+    """Copy an uploaded photo to disk in large chunks, enforcing a size limit.
+    
+    Returns:
+        int: Bytes written, or None if the upload exceeded max_size (the
+        partial file is removed)
+    
+    Raises:
+        Exception: Whatever reading the upload or writing the file raised;
+        the partial file is removed first
+    """
+    written = 0
+    try:
+        with open(photo_path, 'wb', buffering=PHOTO_COPY_BUFFER_SIZE) as out:
+            while True:
+                chunk = stream.read(PHOTO_COPY_BUFFER_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_size:
+                    break
+                out.write(chunk)
+    except Exception:
+        # A client disconnect or full disk must not leave a partial file
+        if os.path.exists(photo_path):
+            os.remove(photo_path)
+        raise
+    if written > max_size:
+        os.remove(photo_path)
+        return None
+    return written
 
 
 def _handle_photo_uploads(entry, photos, allowed_file_func):
@@ -205,17 +296,18 @@ def _handle_photo_uploads(entry, photos, allowed_file_func):
                     raise ValueError("Invalid filename")
                 photo_path = os.path.join(upload_folder, safe_filename)
 
-                # Check file size before saving
-                photo.seek(0, os.SEEK_END)
-                file_size = photo.tell()
-                photo.seek(0)
+                max_size = current_app.config.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024)
 
-                if file_size > current_app.config.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024):
-                    current_app.logger.warning(f'Photo upload too large: {file_size} bytes')
+                # A declared part size over the limit can be rejected up front,
+                # but the header is client-supplied, so the copy below counts
+                # the bytes actually received
+                if photo.content_length and photo.content_length > max_size:
+                    current_app.logger.warning(f'Photo upload too large: {photo.content_length} bytes')
                     continue
 
-                # Save the file
-                photo.save(photo_path)
+                if _save_photo_stream(photo.stream, photo_path, max_size) is None:
+                    current_app.logger.warning(f'Photo upload too large: over {max_size} bytes')
+                    continue
 
                 # Create photo record in database
                 new_photo = Photo(
@@ -236,6 +328,10 @@ def create_quick_entry(user_id, form_data, tag_ids=None, new_tags_json=None, pho
         # Get content from form_data
         content = form_data.get('content', '')
         
+        # Reject blank submissions before running the sanitizer
+        if not content or not content.strip():
+            raise ValueError('Journal entry cannot be empty.')
+
         # Sanitize content
         sanitized_content = sanitize_journal_content(content)
 
@@ -247,58 +343,35 @@ def create_quick_entry(user_id, form_data, tag_ids=None, new_tags_json=None, pho
             raise ValueError('Journal entry is too long. Please shorten your entry.')
 
         # Handle location and weather data
-        location_id, weather_id = _handle_location_and_weather(form_data)
+        location_obj, weather_obj = _handle_location_and_weather(form_data)
 
         # Create journal entry
         entry = JournalEntry(
             user_id=user_id,
             content=sanitized_content,
             entry_type='quick',
-            location_id=location_id,
-            weather_id=weather_id
+            location=location_obj,
+            weather=weather_obj
         )
 
-        # Add selected existing tags
-        valid_tag_ids = []
-        if tag_ids:
-            # Validate tag IDs (ensure they are integers and belong to the user)
-            for tag_id in tag_ids:
-                try:
-                    tag_id_int = int(tag_id)
-                    valid_tag_ids.append(tag_id_int)
-                except (ValueError, TypeError):
-                    # Skip invalid IDs
-                    pass
-
-            # Get tags belonging to the current user
-            tags = Tag.query.filter(
-                Tag.id.in_(valid_tag_ids),
-                Tag.user_id == user_id
-            ).all()
-            entry.tags = tags
-        else:
-            entry.tags = []
+        # Add selected existing tags (integer IDs belonging to the user)
+        entry.tags = _select_user_tags(user_id, tag_ids)
 
         # Create and add new tags
         if new_tags_json:
             try:
                 new_tags_data = json.loads(new_tags_json)
                 
-                # Bulk load existing tags to prevent N+1 queries
-                tag_names = [sanitize_tag_name(tag_data.get('name', '')) for tag_data in new_tags_data]
-                existing_tags = Tag.query.filter(
-                    Tag.name.in_(tag_names),
-                    Tag.user_id == user_id
-                ).all()
-                
-                # Create a map of existing tags by name
-                existing_tags_map = {tag.name: tag for tag in existing_tags}
+                # Map the user's existing tags by name to prevent N+1 queries
+                user_tags = _get_user_tags(user_id)
+                existing_tags_map = {tag.name: tag for tag in user_tags.values()}
                 
                 for tag_data in new_tags_data:
                     try:
                         # Sanitize tag name
                         tag_name = sanitize_tag_name(tag_data.get('name', ''))
-                        tag_color = validate_color_hex(tag_data.get('color', '#6c757d'))
+                        color = tag_data.get('color')
+                        tag_color = validate_color_hex(color) if color else DEFAULT_TAG_COLOR
 
                         # Check if tag exists using pre-loaded map
                         existing_tag = existing_tags_map.get(tag_name)
@@ -317,6 +390,8 @@ def create_quick_entry(user_id, form_data, tag_ids=None, new_tags_json=None, pho
                             db.session.add(new_tag)
                             db.session.flush()  # Get ID without committing
                             entry.tags.append(new_tag)
+                            user_tags[new_tag.id] = new_tag
+                            existing_tags_map[tag_name] = new_tag
                     except Exception as e:
                         # Log error but continue with other tags
                         current_app.logger.warning(f'Tag validation error: {str(e)}')
@@ -324,14 +399,13 @@ def create_quick_entry(user_id, form_data, tag_ids=None, new_tags_json=None, pho
                 # If JSON parsing fails, log it but continue
                 current_app.logger.warning(f'Invalid JSON for new tags: {new_tags_json[:100]}')
 
-        db.session.add(entry)
-        db.session.flush()  # Get ID without committing
+        # Link weather record back to journal entry
+        if weather_obj:
+            weather_obj.journal_entry = entry
 
-        # Update weather record to link back to journal entry
-        if weather_id:
-            weather_record = db.session.get(WeatherData, weather_id)
-            if weather_record:
-                weather_record.journal_entry_id = entry.id
+        # Save location, weather and entry together in a single flush
+        db.session.add_all([obj for obj in (location_obj, weather_obj, entry) if obj is not None])
+        db.session.flush()  # Get ID without committing
 
         # Handle photo uploads
         _handle_photo_uploads(entry, photos, allowed_file_func)
@@ -372,12 +446,11 @@ def create_guided_entry(user_id, form_data, tag_ids, new_tags_json, photos, main
     """
     try:
         # Get the questions to extract question text for responses
-        from models import QuestionManager
         questions = QuestionManager.get_questions(template_id)
         question_text_map = {str(q['id']): q['text'] for q in questions}
         
         # Handle location and weather data
-        location_id, weather_id = _handle_location_and_weather(form_data)
+        location_obj, weather_obj = _handle_location_and_weather(form_data)
         
         # First, create the journal entry
         entry = JournalEntry(
@@ -385,39 +458,27 @@ def create_guided_entry(user_id, form_data, tag_ids, new_tags_json, photos, main
             content=main_content,
             entry_type='guided',
             template_id=template_id,
-            location_id=location_id,
-            weather_id=weather_id
+            location=location_obj,
+            weather=weather_obj
         )
 
-        # Add selected existing tags
-        if tag_ids:
-            tags = Tag.query.filter(
-                Tag.id.in_(tag_ids),
-                Tag.user_id == user_id
-            ).all()
-            entry.tags = tags
-        else:
-            entry.tags = []
+        # Add selected existing tags (integer IDs belonging to the user)
+        entry.tags = _select_user_tags(user_id, tag_ids)
 
         # Create and add new tags
         if new_tags_json:
             try:
                 new_tags_data = json.loads(new_tags_json)
                 
-                # Bulk load existing tags to prevent N+1 queries
-                tag_names = [sanitize_tag_name(tag_data.get('name', '')) for tag_data in new_tags_data]
-                existing_tags = Tag.query.filter(
-                    Tag.name.in_(tag_names),
-                    Tag.user_id == user_id
-                ).all()
-                
-                # Create a map of existing tags by name
-                existing_tags_map = {tag.name: tag for tag in existing_tags}
+                # Map the user's existing tags by name to prevent N+1 queries
+                user_tags = _get_user_tags(user_id)
+                existing_tags_map = {tag.name: tag for tag in user_tags.values()}
                 
                 for tag_data in new_tags_data:
                     # Sanitize tag name
                     tag_name = sanitize_tag_name(tag_data.get('name', ''))
-                    tag_color = validate_color_hex(tag_data.get('color', '#6c757d'))
+                    color = tag_data.get('color')
+                    tag_color = validate_color_hex(color) if color else DEFAULT_TAG_COLOR
                     
                     # Check if tag exists using pre-loaded map
                     existing_tag = existing_tags_map.get(tag_name)
@@ -436,18 +497,19 @@ def create_guided_entry(user_id, form_data, tag_ids, new_tags_json, photos, main
                         db.session.add(new_tag)
                         db.session.flush()  # Get ID without committing
                         entry.tags.append(new_tag)
+                        user_tags[new_tag.id] = new_tag
+                        existing_tags_map[tag_name] = new_tag
             except json.JSONDecodeError:
                 # If JSON parsing fails, log it but continue
                 current_app.logger.warning(f'Invalid JSON for new tags: {new_tags_json[:100]}')
 
-        db.session.add(entry)
-        db.session.flush()  # Get the ID without committing
+        # Link weather record back to journal entry
+        if weather_obj:
+            weather_obj.journal_entry = entry
 
-        # Update weather record to link back to journal entry
-        if weather_id:
-            weather_record = db.session.get(WeatherData, weather_id)
-            if weather_record:
-                weather_record.journal_entry_id = entry.id
+        # Save location, weather and entry together in a single flush
+        db.session.add_all([obj for obj in (location_obj, weather_obj, entry) if obj is not None])
+        db.session.flush()  # Get the ID without committing
 
         # Process form data
         for key, value in form_data.items():
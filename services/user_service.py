@@ -1,10 +1,101 @@
-from models import db, User
+from models import db, User, hash_token, hash_password
+from config import COMMON_PASSWORDS
 from validators import sanitize_username, sanitize_email, validate_password
 from wtforms.validators import ValidationError
-from email_utils import send_email_change_confirmation, send_password_reset_email
-from flask import current_app
+from email_utils import send_email, send_email_change_confirmation, send_password_reset_email
+from flask import current_app, g
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import check_password_hash
+import functools
+import jinja2
 import pytz
 
+# Hash checked against when a username is unknown, so failed logins take the
+# same time whether or not the account exists (pre-warmed at app startup)
+_DUMMY_HASH = None
+
+def _get_dummy_hash():
+    """Return the password hash used to equalize authentication timing."""
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        dummy_user = User()
+        dummy_user.set_password('dummy-password-for-timing')
+        _DUMMY_HASH = dummy_user.password_hash
+    return _DUMMY_HASH
+
+def warm_password_hashing():
+    """Generate the timing-equalization hash up front so no login pays for it."""
+    _get_dummy_hash()
+
+# Verification email bodies, compiled once per process
+_VERIFY_TEXT_TPL = jinja2.Template(
+    "Hello {{ username }},\n\n"
+    "Please verify your email address by visiting the following link:\n"
+    "{{ verify_url }}\n\n"
+    "This link expires in 24 hours.\n\n"
+    "Thank you,\n{{ app_name }} Team\n"
+)
+_VERIFY_HTML_TPL = jinja2.Environment(autoescape=True).from_string(
+    "<p>Hello {{ username }},</p>"
+    "<p>Please verify your email address by <a href=\"{{ verify_url }}\">clicking here</a>.</p>"
+    "<p>Alternatively, you can paste the following link in your browser's address bar:</p>"
+    "<p>{{ verify_url }}</p>"
+    "<p>This link expires in 24 hours.</p>"
+    "<p>Thank you,<br>{{ app_name }} Team</p>"
+)
+
+def _send_verify(user, token):
+    """Send the email verification link to a user's current address."""
+    config = current_app.config
+    app_name = config.get('APP_NAME', 'Journal App')
+    context = {
+        'username': user.username,
+        'app_name': app_name,
+        'verify_url': f"{config.get('APP_URL', 'http://localhost:5000')}/verify-email/{token}",
+    }
+    send_email(f"{app_name} - Verify Your Email", [user.email],
+               _VERIFY_TEXT_TPL.render(context), _VERIFY_HTML_TPL.render(context))
+
+# Unique constraints on users, under PostgreSQL's default names for unique=True
+_USER_UNIQUE_CONSTRAINTS = {
+    'users_username_key': 'username',
+    'users_email_key': 'email',
+}
+
+def _conflicting_user_column(error):
+    """Name the users column whose unique constraint an IntegrityError violated, or None."""
+    diag = getattr(error.orig, 'diag', None)
+    constraint = getattr(diag, 'constraint_name', None)
+    if constraint:
+        return _USER_UNIQUE_CONSTRAINTS.get(constraint)
+    # SQLite has no constraint names: "UNIQUE constraint failed: users.email"
+    message = str(error.orig)
+    for column in ('username', 'email'):
+        if message.endswith(f'UNIQUE constraint failed: users.{column}'):
+            return column
+    return None
+
+@functools.lru_cache(maxsize=1024)
+def _validate_timezone(timezone):
+    """Resolve a timezone name, raising UnknownTimeZoneError if invalid (valid names are cached)."""
+    return pytz.timezone(timezone)
+
+def _get_user(user_id):
+    """Get a user by ID, reusing the instance already loaded in this request."""
+    user = g.get('_cached_user')
+    if user is not None and user in db.session and user.id == user_id:
+        return user
+    user = db.session.get(User, user_id)
+    g._cached_user = user
+    return user
+
+def _evict_verification_cache(user_id):
+    """Forget cached password checks for a user."""
+    with _verification_cache_lock:
+        for key in [k for k, (cached_id, _) in _verification_cache.items() if cached_id == user_id]:
+            del _verification_cache[key]
+
 def register_user(username, email_input, password, timezone):
     try:
         # Sanitize inputs
@@ -18,24 +109,14 @@ def register_user(username, email_input, password, timezone):
 
         # Validate timezone
         try:
-            pytz.timezone(timezone)
+            _validate_timezone(timezone)
         except pytz.exceptions.UnknownTimeZoneError:
             timezone = 'UTC'  # Default to UTC if invalid
 
-        # Check if username exists
-        if User.query.filter_by(username=username).first():
-            return None, 'Username already exists.'
-
-        # Check if email exists (if provided)
-        if email and User.query.filter_by(email=email).first():
-            return None, 'Email already registered.'
-
         # Check for common passwords
-        common_passwords = ['password', '123456', 'qwerty', 'admin', 'welcome']
-        if password.lower() in common_passwords:
+        if password.lower() in COMMON_PASSWORDS:
             return None, 'Please choose a stronger password.'
 
-        # Create new user
         new_user = User(
             username=username,
             timezone=timezone,
@@ -49,21 +130,28 @@ def register_user(username, email_input, password, timezone):
         if email:
             verification_token = new_user.generate_email_verification_token()
 
+        # Rely on the unique constraints rather than pre-checking availability.
+        # The flush is a single INSERT; the ORM fetches the new id with
+        # RETURNING where the database supports it, so no extra round trip
         db.session.add(new_user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            conflict = _conflicting_user_column(e)
+            if conflict == 'email':
+                return None, 'Email already registered.'
+            if conflict == 'username':
+                return None, 'Username already exists.'
+            # Not a duplicate account (e.g. a NOT NULL or check violation)
+            raise
 
         current_app.logger.info(f'New user registered: {username}')
 
         # Send verification email if email was provided
         if email and verification_token:
             try:
-                app_name = current_app.config.get('APP_NAME', 'Journal App')
-                app_url = current_app.config.get('APP_URL', 'http://localhost:5000')
-                verify_url = f"{app_url}/verify-email/{verification_token}"
-                subject = f"{app_name} - Verify Your Email"
-                text_body = f'Hello {new_user.username},...'
-                html_body = f'<p>Hello {new_user.username},...</p>'
-                send_email(subject, [email], text_body, html_body)
+                _send_verify(new_user, verification_token)
                 return new_user, 'Registration successful. Please check your email to verify your address, then log in.'
             except Exception as e:
                 current_app.logger.error(f"Failed to send verification email: {str(e)}")
@@ -80,18 +168,30 @@ def register_user(username, email_input, password, timezone):
 def authenticate_user(username, password):
     """Authenticates a user."""
     user = User.query.filter_by(username=username).first()
-    if user and user.check_password(password):
+    if user is None:
+        # Burn the same hashing cost as a real check to avoid a username oracle
+        check_password_hash(_get_dummy_hash(), password)
+        return None
+    if user.check_password(password):
         return user
     return None
 
 def update_user_timezone(user_id, timezone):
-    """Updates a user's timezone."""
+    """Updates a user's timezone.
+
+    Args:
+        user_id (int): The ID of the user to update.
+        timezone (str): The new timezone string.
+
+    Returns:
+        tuple: A tuple containing (success_boolean, message_string).
+    """
     try:
-        pytz.timezone(timezone)
+        _validate_timezone(timezone)
     except pytz.exceptions.UnknownTimeZoneError:
         return False, 'Invalid timezone selected.'
 
-    user = User.query.get(user_id)
+    user = _get_user(user_id)
     if not user:
         return False, 'User not found.'
 
@@ -101,7 +201,7 @@ def update_user_timezone(user_id, timezone):
 
 def change_user_password(user_id, current_password, new_password, confirm_password):
     """Changes a user's password."""
-    user = User.query.get(user_id)
+    user = _get_user(user_id)
     if not user:
         return False, 'User not found.'
 
@@ -116,20 +216,23 @@ def change_user_password(user_id, current_password, new_password, confirm_passwo
     except ValidationError as e:
         return False, str(e)
 
-    common_passwords = ['password', '123456', 'qwerty', 'admin', 'welcome']
-    if new_password.lower() in common_passwords:
+    if new_password.lower() in COMMON_PASSWORDS:
         return False, 'Please choose a stronger password.'
 
     if user.check_password(new_password):
         return False, 'New password must be different from current password.'
 
-    user.set_password(new_password)
+    # Write the new hash with a single UPDATE rather than an ORM flush
+    db.session.execute(
+        update(User).where(User.id == user.id).values(password_hash=hash_password(new_password))
+    )
     db.session.commit()
+    _evict_verification_cache(user.id)
     return True, 'Password updated successfully.'
 
 def change_user_email(user_id, password, new_email, confirm_email):
     """Initiates an email change for a user."""
-    user = User.query.get(user_id)
+    user = _get_user(user_id)
     if not user:
         return False, 'User not found.'
 
@@ -152,7 +255,7 @@ def change_user_email(user_id, password, new_email, confirm_email):
 
 def add_user_email(user_id, password, email):
     """Adds an email to a user's account."""
-    user = User.query.get(user_id)
+    user = _get_user(user_id)
     if not user:
         return False, 'User not found.'
 
@@ -170,22 +273,16 @@ def add_user_email(user_id, password, email):
     except Exception as e:
         return False, f'Invalid email address: {str(e)}'
 
-    existing_user = User.query.filter_by(email=email).first()
-    if existing_user:
-        return False, 'This email address is already in use.'
-
     user.email = email
     verification_token = user.generate_email_verification_token()
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False, 'This email address is already in use.'
 
     try:
-        app_name = current_app.config.get('APP_NAME', 'Journal App')
-        app_url = current_app.config.get('APP_URL', 'http://localhost:5000')
-        verify_url = f"{app_url}/verify-email/{verification_token}"
-        subject = f"{app_name} - Verify Your Email"
-        text_body = f'Hello {user.username},...'
-        html_body = f'<p>Hello {user.username},...</p>'
-        send_email(subject, [email], text_body, html_body)
+        _send_verify(user, verification_token)
         return True, 'Email address added. Please check your inbox to verify your email.'
     except Exception as e:
         current_app.logger.error(f"Failed to send verification email: {str(e)}")
@@ -193,7 +290,7 @@ def add_user_email(user_id, password, email):
 
 def resend_verification_email(user_id):
     """Resends the email verification link to the user."""
-    user = User.query.get(user_id)
+    user = _get_user(user_id)
     if not user:
         return False, 'User not found.'
 
@@ -207,13 +304,7 @@ def resend_verification_email(user_id):
     db.session.commit()
 
     try:
-        app_name = current_app.config.get('APP_NAME', 'Journal App')
-        app_url = current_app.config.get('APP_URL', 'http://localhost:5000')
-        verify_url = f"{app_url}/verify-email/{verification_token}"
-        subject = f"{app_name} - Verify Your Email"
-        text_body = f'Hello {user.username},...'
-        html_body = f'<p>Hello {user.username},...</p>'
-        send_email(subject, [user.email], text_body, html_body)
+        _send_verify(user, verification_token)
         return True, 'Verification email sent. Please check your inbox.'
     except Exception as e:
         current_app.logger.error(f"Failed to send verification email: {str(e)}")
@@ -230,7 +321,9 @@ def request_password_reset(email):
 
 def reset_password(token, password, confirm_password):
     """Resets a user's password."""
-    user = User.query.filter_by(reset_token=token).first()
+    # Tokens are stored hashed; look up by hash and let verify_reset_token
+    # confirm it with a constant-time comparison
+    user = User.query.filter_by(reset_token=hash_token(token)).first()
     if not user or not user.verify_reset_token(token):
         return False, 'Invalid or expired reset link.'
 
@@ -240,84 +333,14 @@ def reset_password(token, password, confirm_password):
     if len(password) < 8:
         return False, 'Password must be at least 8 characters long.'
 
-    user.set_password(password)
-    user.clear_reset_token()
+    # Set the new hash and consume the token in one UPDATE
+    db.session.execute(
+        update(User).where(User.id == user.id).values(
+            password_hash=hash_password(password),
+            reset_token=None,
+            reset_token_expiry=None
+        )
+    )
     db.session.commit()
+    _evict_verification_cache(user.id)
     return True, 'Your password has been reset successfully. You can now log in with your new password.'
-
-
-
-def add_user_email(user_id, password, email):
-    """Adds an email to a user's account."""
-    user = User.query.get(user_id)
-    if not user:
-        return False, 'User not found.'
-
-    if user.email:
-        return False, 'You already have an email address. Use the change email form instead.'
-
-    if not email or not password:
-        return False, 'Email and password are required.'
-
-    if not user.check_password(password):
-        return False, 'Password is incorrect.'
-
-    try:
-        email = sanitize_email(email)
-    except Exception as e:
-        return False, f'Invalid email address: {str(e)}'
-
-    existing_user = User.query.filter_by(email=email).first()
-    if existing_user:
-        return False, 'This email address is already in use.'
-
-    user.email = email
-    verification_token = user.generate_email_verification_token()
-    db.session.commit()
-
-    try:
-        app_name = current_app.config.get('APP_NAME', 'Journal App')
-        app_url = current_app.config.get('APP_URL', 'http://localhost:5000')
-        verify_url = f"{app_url}/verify-email/{verification_token}"
-        subject = f"{app_name} - Verify Your Email"
-        text_body = f'Hello {user.username},...'
-        html_body = f'<p>Hello {user.username},...</p>'
-        send_email(subject, [email], text_body, html_body)
-        return True, 'Email address added. Please check your inbox to verify your email.'
-    except Exception as e:
-        current_app.logger.error(f"Failed to send verification email: {str(e)}")
-        return True, 'Email address added, but we could not send a verification email. You can resend it from settings.'
-
-
-
-def update_user_timezone(user_id, timezone):
-    """Updates a user's timezone.
-
-    Args:
-        user_id (int): The ID of the user to update.
-        timezone (str): The new timezone string.
-
-    Returns:
-        tuple: A tuple containing (success_boolean, message_string).
-    """
-    try:
-        pytz.timezone(timezone)
-    except pytz.exceptions.UnknownTimeZoneError:
-        return False, 'Invalid timezone selected.'
-
-    user = User.query.get(user_id)
-    if not user:
-        return False, 'User not found.'
-
-    user.timezone = timezone
-    db.session.commit()
-    return True, 'Timezone updated successfully.'
-
-
-def authenticate_user(username, password):
-    """Authenticates a user."""
-    user = User.query.filter_by(username=username).first()
-    if user and user.check_password(password):
-        return user
-    return None
-
@@ -11,9 +11,16 @@ This service handles:
 import os
 import requests
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple
-from models import db, Location, WeatherData
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import contains_eager
+from models import db, Location, WeatherData, geohash_cells_for_box, geohash_prefix_end
 
 logger = logging.getLogger(__name__)
 
@@ -26,12 +33,38 @@ class WeatherService:
         self.base_url = "http://api.openweathermap.org/data/2.5"
         self.geo_url = "http://api.openweathermap.org/geo/1.0"
         
+        # Pooled HTTP session so repeated API calls reuse connections
+        self.session = self._create_session()
+        
+        # Worker threads for overlapping independent API calls
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='weather')
+        
         # Cache duration for weather data (30 minutes)
         self.cache_duration = timedelta(minutes=30)
         
+        # Geocoding results rarely change, so keep them in memory for a day
+        self.geocode_cache_duration = timedelta(days=1)
+        self.geocode_cache_max_size = 1024
+        self._geocode_cache = OrderedDict()  # key -> (result, expires_at), least recently used first
+        self._geocode_cache_lock = threading.Lock()
+        
         if not self.api_key:
             logger.warning("OpenWeatherMap API key not found. Weather features will use manual input only.")
     
+    def _create_session(self) -> requests.Session:
+        """Create an HTTP session with connection pooling and retries on transient errors."""
+        session = requests.Session()
+        retries = Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET']
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
     def get_weather_by_coordinates(self, latitude: float, longitude: float, 
                                  use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """
@@ -56,6 +89,13 @@ class WeatherService:
                 return cached_weather.to_dict()
         
         try:
+            # A location not stored yet needs reverse geocoding before the weather
+            # is saved; start that lookup now so it overlaps the weather request
+            location = self._find_location(latitude, longitude)
+            reverse_future = None
+            if not location:
+                reverse_future = self._executor.submit(self.reverse_geocode, latitude, longitude)
+            
             # Fetch current weather
             weather_url = f"{self.base_url}/weather"
             params = {
@@ -65,13 +105,24 @@ class WeatherService:
                 'units': 'imperial'  # Fahrenheit
             }
             
-            response = requests.get(weather_url, params=params, timeout=10)
+            response = self.session.get(weather_url, params=params, timeout=10)
             response.raise_for_status()
             weather_data = response.json()
             
+            # Hand the prefetched result to the save, so a failed lookup is not
+            # repeated there
+            location_info = None
+            if reverse_future:
+                try:
+                    location_info = reverse_future.result()
+                except Exception as e:
+                    logger.warning(f"Background reverse geocode failed: {e}")
+            
             # Parse and save weather data
             parsed_weather = self._parse_weather_response(weather_data)
-            weather_record = self._save_weather_data(parsed_weather, latitude, longitude)
+            weather_record = self._save_weather_data(
+                parsed_weather, latitude, longitude, location, location_info
+            )
             
             return weather_record.to_dict() if weather_record else parsed_weather
             
@@ -115,6 +166,15 @@ class WeatherService:
         if not self.api_key:
             return None
         
+        cache_key = ('geo', location_name.strip().lower())
+        coordinates = self._get_cached_geocode(cache_key)
+        if coordinates is None:
+            coordinates = self._geocode_location_uncached(location_name)
+            self._cache_geocode(cache_key, coordinates)
+        return coordinates
+    
+    def _geocode_location_uncached(self, location_name: str) -> Optional[Tuple[float, float]]:
+        """Query the geocoding API for a location name."""
         # Try multiple search formats to improve geocoding success
         search_variants = [
             location_name,  # Original search term
@@ -166,7 +226,7 @@ class WeatherService:
                     'appid': self.api_key
                 }
                 
-                response = requests.get(geocode_url, params=params, timeout=10)
+                response = self.session.get(geocode_url, params=params, timeout=10)
                 response.raise_for_status()
                 geo_data = response.json()
                 
@@ -210,6 +270,16 @@ class WeatherService:
         if not self.api_key:
             return None
         
+        # Round to ~100m so nearby fixes share a cache entry
+        cache_key = ('reverse', round(latitude, 3), round(longitude, 3))
+        location_info = self._get_cached_geocode(cache_key)
+        if location_info is None:
+            location_info = self._reverse_geocode_uncached(latitude, longitude)
+            self._cache_geocode(cache_key, location_info)
+        return dict(location_info) if location_info else None
+    
+    def _reverse_geocode_uncached(self, latitude: float, longitude: float) -> Optional[Dict[str, str]]:
+        """Query the reverse geocoding API for coordinates."""
         try:
             reverse_url = f"{self.geo_url}/reverse"
             params = {
@@ -219,7 +289,7 @@ class WeatherService:
                 'appid': self.api_key
             }
             
-            response = requests.get(reverse_url, params=params, timeout=10)
+            response = self.session.get(reverse_url, params=params, timeout=10)
             response.raise_for_status()
             geo_data = response.json()
             
@@ -255,7 +325,16 @@ class WeatherService:
         try:
             # Try to get location information via reverse geocoding
             location_info = self.reverse_geocode(latitude, longitude)
-            
+        except Exception as e:
+            logger.error(f"Error creating location from coordinates: {e}")
+            return None
+        return self._store_location(latitude, longitude, location_info, name)
+    
+    def _store_location(self, latitude: float, longitude: float,
+                        location_info: Optional[Dict[str, str]],
+                        name: Optional[str] = None) -> Optional[Location]:
+        """Save a GPS Location using already resolved reverse geocoding info."""
+        try:
             location = Location(
                 name=name,
                 latitude=latitude,
@@ -311,6 +390,29 @@ class WeatherService:
             db.session.rollback()
             return None
     
+    def _get_cached_geocode(self, key: tuple) -> Optional[Any]:
+        """Get a cached geocoding result if it has not expired."""
+        with self._geocode_cache_lock:
+            cached = self._geocode_cache.get(key)
+            if cached is None:
+                return None
+            if cached[1] <= datetime.utcnow():
+                del self._geocode_cache[key]
+                return None
+            self._geocode_cache.move_to_end(key)
+            return cached[0]
+    
+    def _cache_geocode(self, key: tuple, result: Optional[Any]) -> None:
+        """Cache a successful geocoding result."""
+        if result is None:
+            return
+        with self._geocode_cache_lock:
+            self._geocode_cache[key] = (result, datetime.utcnow() + self.geocode_cache_duration)
+            self._geocode_cache.move_to_end(key)
+            # Evict least recently used entries beyond the cap
+            while len(self._geocode_cache) > self.geocode_cache_max_size:
+                self._geocode_cache.popitem(last=False)
+    
     def _get_cached_weather(self, latitude: float, longitude: float) -> Optional[WeatherData]:
         """Get cached weather data for coordinates if recent enough."""
         cutoff_time = datetime.utcnow() - self.cache_duration
@@ -319,17 +421,30 @@ class WeatherService:
         lat_range = 0.009  # About 1km in latitude degrees
         lon_range = 0.009  # About 1km in longitude degrees
         
-        location = Location.query.filter(
-            Location.latitude.between(latitude - lat_range, latitude + lat_range),
-            Location.longitude.between(longitude - lon_range, longitude + lon_range)
-        ).first()
-        
-        if not location:
-            return None
+        # Narrow candidates with the indexed geohash prefixes of every cell the
+        # box touches (a point near a cell edge has neighbours in the next
+        # cell), then apply the exact box check
+        geohash_cells = geohash_cells_for_box(
+            latitude - lat_range, longitude - lon_range,
+            latitude + lat_range, longitude + lon_range
+        )
+        # Prefix matches as ranges, since LIKE can't use the plain btree index
+        # under non-C collations (PostgreSQL) or case-insensitive LIKE (SQLite)
+        geohash_ranges = []
+        for cell in geohash_cells:
+            end = geohash_prefix_end(cell)
+            if end is None:
+                geohash_ranges.append(Location.geohash >= cell)
+            else:
+                geohash_ranges.append(and_(Location.geohash >= cell, Location.geohash < end))
         
-        # Find recent weather data for this location
-        weather = WeatherData.query.filter(
-            WeatherData.location_id == location.id,
+        # Find the most recent weather recorded at a nearby location in one query
+        weather = WeatherData.query.join(WeatherData.location).options(
+            contains_eager(WeatherData.location)
+        ).filter(
+            or_(*geohash_ranges),
+            Location.latitude.between(latitude - lat_range, latitude + lat_range),
+            Location.longitude.between(longitude - lon_range, longitude + lon_range),
             WeatherData.recorded_at > cutoff_time
         ).order_by(WeatherData.recorded_at.desc()).first()
         
@@ -354,18 +469,26 @@ class WeatherService:
             'weather_source': 'openweathermap'
         }
     
+    def _find_location(self, latitude: float, longitude: float) -> Optional[Location]:
+        """Return the stored Location at exactly these coordinates, if any."""
+        return Location.query.filter(
+            Location.latitude == latitude,
+            Location.longitude == longitude
+        ).first()
+    
     def _save_weather_data(self, weather_dict: Dict[str, Any], 
-                          latitude: float, longitude: float) -> Optional[WeatherData]:
-        """Save weather data to database."""
+                          latitude: float, longitude: float,
+                          location: Optional[Location] = None,
+                          location_info: Optional[Dict[str, str]] = None) -> Optional[WeatherData]:
+        """Save weather data to database.
+        
+        location is the stored Location for the coordinates, if one was found;
+        otherwise a new one is created from location_info, the reverse geocode
+        the caller already resolved.
+        """
         try:
-            # Find or create location
-            location = Location.query.filter(
-                Location.latitude == latitude,
-                Location.longitude == longitude
-            ).first()
-            
             if not location:
-                location = self.create_location_from_coordinates(latitude, longitude)
+                location = self._store_location(latitude, longitude, location_info)
             
             if not location:
                 return None
@@ -399,20 +522,14 @@ class WeatherService:
         """
         from models import JournalEntry
         
-        # Get locations from user's recent entries
-        recent_entries = db.session.query(JournalEntry.location_id).filter(
-            JournalEntry.user_id == user_id,
-            JournalEntry.location_id.isnot(None)
-        ).order_by(JournalEntry.created_at.desc()).limit(limit * 2).all()
-        
-        if not recent_entries:
-            return []
-        
-        location_ids = list(set([entry.location_id for entry in recent_entries if entry.location_id]))
-        
-        locations = Location.query.filter(
-            Location.id.in_(location_ids)
-        ).order_by(Location.updated_at.desc()).limit(limit).all()
+        # Get distinct locations from user's entries, most recently used first
+        locations = Location.query.join(
+            JournalEntry, JournalEntry.location_id == Location.id
+        ).filter(
+            JournalEntry.user_id == user_id
+        ).group_by(Location.id).order_by(
+            func.max(JournalEntry.created_at).desc()
+        ).limit(limit).all()
         
         return locations
 
@@ -3,94 +3,137 @@
 Test the updated dashboard weather/location display
 """
 
+import functools
 import os
+import re
 import sys
+from pathlib import Path
 
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
 
+# Dashboard needles: new layout structure
+LAYOUT_ELEMENTS = [
+    ('Entry body container', 'entry-body'),
+    ('Main content area', 'entry-main-content'),
+    ('Context area', 'entry-context'),
+    ('Weather info display', 'entry-weather-info'),
+    ('Location info display', 'entry-location-info'),
+    ('Weather template check', 'entry.weather'),
+    ('Location template check', 'entry.location'),
+    ('Temperature display', 'entry.weather.temperature'),
+    ('Weather condition display', 'entry.weather.weather_condition'),
+    ('Location city display', 'entry.location.city')
+]
+
+# CSS classes
+CSS_CLASSES = [
+    'entry-body',
+    'entry-main-content',
+    'entry-context',
+    'entry-weather-info',
+    'entry-location-info',
+    'weather-temp',
+    'weather-condition',
+    'location-name'
+]
+
+# Responsive design
+RESPONSIVE_FEATURES = [
+    ('Mobile flexbox layout', 'flex-direction: column'),
+    ('Desktop side-by-side', 'justify-content: space-between'),
+    ('Mobile context stacking', '@media (max-width: 768px)'),
+    ('Small mobile adjustments', '@media (max-width: 480px)'),
+    ('Context alignment', 'align-items: flex-end')
+]
+
+# Template logic
+TEMPLATE_LOGIC = [
+    ('Weather conditional', '{% if entry.weather %}'),
+    ('Location conditional', '{% if entry.location %}'),
+    ('Combined conditional', '{% if entry.location or entry.weather %}'),
+    ('Temperature rounding', 'entry.weather.temperature|round|int'),
+    ('Location city access', 'entry.location.city'),
+    ('Weather condition access', 'entry.weather.weather_condition')
+]
+
+NEEDLES = (
+    [element for _, element in LAYOUT_ELEMENTS]
+    + [f'.{css_class}' for css_class in CSS_CLASSES]
+    + [feature for _, feature in RESPONSIVE_FEATURES]
+    + [logic for _, logic in TEMPLATE_LOGIC]
+)
+
+# Longest needles first inside a lookahead, so every position is tried and a
+# needle that is a prefix of a longer one is implied by the longer match
+NEEDLE_PATTERN = re.compile(
+    b'(?=(' + b'|'.join(re.escape(needle.encode('utf-8'))
+                        for needle in sorted(set(NEEDLES), key=len, reverse=True)) + b'))'
+)
+
+@functools.lru_cache(maxsize=1)
+def _template_bytes(path):
+    """Read a template's raw bytes once per process."""
+    return Path(path).read_bytes()
+
 def test_dashboard_weather_location_display():
     """Test that the dashboard shows weather and location information properly"""
     
     dashboard_template_path = os.path.join(os.path.dirname(__file__), 'templates', 'dashboard.html')
     
-    with open(dashboard_template_path, 'r') as f:
-        template_content = f.read()
+    if not os.path.isfile(dashboard_template_path):
+        print(f"❌ Template missing: {dashboard_template_path}")
+        return False
+    
+    # Raw bytes, read once per process; every check below is answered from one scan
+    template_content = _template_bytes(dashboard_template_path)
     
     print("🧪 Testing Dashboard Weather/Location Display")
     print("=" * 60)
     
-    # Check for new layout structure
-    layout_elements = [
-        ('Entry body container', 'entry-body'),
-        ('Main content area', 'entry-main-content'),
-        ('Context area', 'entry-context'),
-        ('Weather info display', 'entry-weather-info'),
-        ('Location info display', 'entry-location-info'),
-        ('Weather template check', 'entry.weather'),
-        ('Location template check', 'entry.location'),
-        ('Temperature display', 'entry.weather.temperature'),
-        ('Weather condition display', 'entry.weather.weather_condition'),
-        ('Location city display', 'entry.location.city')
-    ]
+    # One regex pass collects every needle occurrence; a needle that is a
+    # prefix of a longer match was found there too
+    matches = {match.decode('utf-8') for match in NEEDLE_PATTERN.findall(template_content)}
+    found = {needle for needle in NEEDLES if any(match.startswith(needle) for match in matches)}
+    
+    def is_present(needle):
+        """Tell whether a needle occurs anywhere in the template."""
+        return needle in found
     
     print("🔍 Checking Layout Elements:")
-    for description, element in layout_elements:
-        if element in template_content:
+    found_elements = 0
+    for description, element in LAYOUT_ELEMENTS:
+        if is_present(element):
+            found_elements += 1
             print(f"   ✅ {description}")
         else:
             print(f"   ❌ {description} - NOT FOUND")
     
-    # Check for CSS classes
-    css_classes = [
-        'entry-body',
-        'entry-main-content',
-        'entry-context',
-        'entry-weather-info',
-        'entry-location-info',
-        'weather-temp',
-        'weather-condition',
-        'location-name'
-    ]
-    
     print("\n🎨 Checking CSS Classes:")
-    for css_class in css_classes:
-        if f'.{css_class}' in template_content:
+    found_css = 0
+    for css_class in CSS_CLASSES:
+        if is_present(f'.{css_class}'):
+            found_css += 1
             print(f"   ✅ .{css_class}")
         else:
             print(f"   ❌ .{css_class} - NOT FOUND")
     
-    # Check for responsive design
-    responsive_features = [
-        ('Mobile flexbox layout', 'flex-direction: column'),
-        ('Desktop side-by-side', 'justify-content: space-between'),
-        ('Mobile context stacking', '@media (max-width: 768px)'),
-        ('Small mobile adjustments', '@media (max-width: 480px)'),
-        ('Context alignment', 'align-items: flex-end')
-    ]
-    
     print("\n📱 Checking Responsive Design:")
-    for description, feature in responsive_features:
-        if feature in template_content:
+    found_responsive = 0
+    for description, feature in RESPONSIVE_FEATURES:
+        if is_present(feature):
+            found_responsive += 1
             print(f"   ✅ {description}")
         else:
             print(f"   ❌ {description} - NOT FOUND")
     
-    # Check for proper template logic
-    template_logic = [
-        ('Weather conditional', '{% if entry.weather %}'),
-        ('Location conditional', '{% if entry.location %}'),
-        ('Combined conditional', '{% if entry.location or entry.weather %}'),
-        ('Temperature rounding', 'entry.weather.temperature|round|int'),
-        ('Location city access', 'entry.location.city'),
-        ('Weather condition access', 'entry.weather.weather_condition')
-    ]
-    
     print("\n🔧 Checking Template Logic:")
-    for description, logic in template_logic:
-        if logic in template_content:
+    found_logic = 0
+    for description, logic in TEMPLATE_LOGIC:
+        if is_present(logic):
+            found_logic += 1
             print(f"   ✅ {description}")
         else:
             print(f"   ❌ {description} - NOT FOUND")
@@ -98,19 +141,14 @@ def test_dashboard_weather_location_display():
     print(f"\n🎉 Dashboard Weather/Location Display Test Complete!")
     
     # Summary
-    total_elements = len(layout_elements) + len(css_classes) + len(responsive_features) + len(template_logic)
-    found_elements = sum(1 for _, element in layout_elements if element in template_content)
-    found_css = sum(1 for css_class in css_classes if f'.{css_class}' in template_content)
-    found_responsive = sum(1 for _, feature in responsive_features if feature in template_content)
-    found_logic = sum(1 for _, logic in template_logic if logic in template_content)
-    
+    total_elements = len(LAYOUT_ELEMENTS) + len(CSS_CLASSES) + len(RESPONSIVE_FEATURES) + len(TEMPLATE_LOGIC)
     total_found = found_elements + found_css + found_responsive + found_logic
     
     print(f"\n📊 Summary:")
-    print(f"   Layout Elements: {found_elements}/{len(layout_elements)}")
-    print(f"   CSS Classes: {found_css}/{len(css_classes)}")
-    print(f"   Responsive Features: {found_responsive}/{len(responsive_features)}")
-    print(f"   Template Logic: {found_logic}/{len(template_logic)}")
+    print(f"   Layout Elements: {found_elements}/{len(LAYOUT_ELEMENTS)}")
+    print(f"   CSS Classes: {found_css}/{len(CSS_CLASSES)}")
+    print(f"   Responsive Features: {found_responsive}/{len(RESPONSIVE_FEATURES)}")
+    print(f"   Template Logic: {found_logic}/{len(TEMPLATE_LOGIC)}")
     print(f"   Total: {total_found}/{total_elements}")
     
     if total_found >= total_elements * 0.9:  # 90% or more
@@ -129,12 +167,17 @@ def test_with_real_data():
     
     with app.app_context():
         from models import JournalEntry
+        from sqlalchemy.orm import lazyload
         
         print(f"\n🗃️  Testing with Real Database Data:")
         print("=" * 50)
         
-        # Get recent entries with weather/location
-        entries_with_context = JournalEntry.query.filter(
+        # Get recent entries with weather/location. Both relationships are
+        # mapped lazy='joined', so they come back in this one query; tags are
+        # never shown here, so skip their join (with LIMIT it forces a subquery)
+        entries_with_context = JournalEntry.query.options(
+            lazyload(JournalEntry.tags)
+        ).filter(
             (JournalEntry.weather_id.isnot(None)) | (JournalEntry.location_id.isnot(None))
         ).order_by(JournalEntry.created_at.desc()).limit(3).all()
         
@@ -153,9 +153,16 @@ def test_form_weather_submission():
             user_entries = JournalEntry.query.filter_by(user_id=test_user.id).all()
             print(f"User has {len(user_entries)} entries:")
             
+            # Fetch every referenced weather row in one IN query
+            weather_ids = [entry.weather_id for entry in user_entries if entry.weather_id]
+            weather_by_id = {
+                weather.id: weather
+                for weather in WeatherData.query.filter(WeatherData.id.in_(weather_ids)).all()
+            } if weather_ids else {}
+            
             for entry in user_entries:
                 if entry.weather_id:
-                    weather = WeatherData.query.get(entry.weather_id)
+                    weather = weather_by_id.get(entry.weather_id)
                     if weather:
                         print(f"  Entry {entry.id}: '{entry.content[:30]}...' -> Weather {weather.id}: {weather.temperature}°C, {weather.weather_condition}")
                     else:
@@ -167,7 +174,7 @@ def test_form_weather_submission():
             print("\n=== Cleanup ===")
             for entry in user_entries:
                 if entry.weather_id:
-                    weather = db.session.get(WeatherData, entry.weather_id)
+                    weather = weather_by_id.get(entry.weather_id)
                     if weather:
                         weather.journal_entry_id = None  # Clear the foreign key
                         db.session.delete(weather)
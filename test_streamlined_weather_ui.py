@@ -20,9 +20,10 @@ def test_dashboard_loads_with_new_weather_ui():
         with app.app_context():
             from models import db, User
             
-            import uuid
-            unique_username = f'testuser_{str(uuid.uuid4())[:8]}'
-            test_user = User(username=unique_username, email=f'test_{str(uuid.uuid4())[:8]}@example.com')
+            import secrets
+            tag = secrets.token_hex(4)
+            unique_username = f'testuser_{tag}'
+            test_user = User(username=unique_username, email=f'test_{tag}@example.com')
             test_user.set_password('testpassword')
             
             db.session.add(test_user)
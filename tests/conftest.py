@@ -4,8 +4,11 @@ Test configuration and fixtures for journal application.
 This module provides pytest fixtures and configuration for all tests.
 """
 
+import fnmatch
 import os
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 from unittest.mock import patch, MagicMock
 from flask import url_for, current_app
@@ -263,7 +266,7 @@ def mock_external_services():
     with patch('email_utils.send_password_reset_email') as mock_reset, \
          patch('email_utils.send_email_change_confirmation') as mock_change, \
          patch('services.weather_service.weather_service') as mock_weather, \
-         patch('services.weather_service.requests.get') as mock_requests, \
+         patch('services.weather_service.requests.Session.get') as mock_requests, \
          patch('email_utils.send_email') as mock_send_email:
         
         # Configure default return values
@@ -672,6 +675,254 @@ def pytest_configure(config):
     os.makedirs('reports', exist_ok=True)
 
 
+# Set named form inputs in one round trip and fire their input events
+FILL_FORM_JS = """
+    const values = arguments[0];
+    for (const [name, value] of Object.entries(values)) {
+        const field = document.querySelector(`[name="${name}"]`);
+        field.value = value;
+        field.dispatchEvent(new Event('input', {bubbles: true}));
+    }
+"""
+
+
+# URL patterns pooled browsers refuse to fetch. The app loads no analytics,
+# so in practice this blocks the Bootstrap Icons font; the rest guards
+# against trackers being added later. Patterns match the whole URL, so font
+# patterns end in '*' to cover cache-busting query strings. Chrome logs each
+# blocked request as a SEVERE net::ERR_BLOCKED_BY_CLIENT entry, which the
+# console_errors fixture ignores for these URLs only.
+BLOCKED_URL_PATTERNS = [
+    "*google-analytics*", "*googletagmanager*", "*hotjar*", "*sentry*",
+    "*fonts.googleapis*", "*fonts.gstatic*", "*.woff*", "*.ttf*",
+]
+
+
+def is_deliberately_blocked(log_entry):
+    """Whether a console entry is a request the pool blocks on purpose."""
+    message = log_entry['message']
+    if 'ERR_BLOCKED_BY_CLIENT' not in message:
+        return False
+    # Chrome starts resource errors with the URL that failed
+    url = message.split(' ', 1)[0]
+    return any(fnmatch.fnmatchcase(url, pattern) for pattern in BLOCKED_URL_PATTERNS)
+
+# chromedriver found once per process; when set, drivers start from it
+# directly instead of asking Selenium Manager to locate one each time
+CHROMEDRIVER_PATH = os.environ.get('CHROMEDRIVER_PATH') or shutil.which('chromedriver')
+
+
+class BrowserPool:
+    """Headless Chrome instances shared by the Selenium functional tests.
+    
+    A cold Chrome start costs seconds, so each browser profile is launched at
+    most once per session and handed out again after its state is cleared.
+    """
+    
+    # Fixture providing each profile, used to see which profiles a run needs
+    PROFILE_FIXTURES = {'desktop': 'chrome_driver', 'mobile': 'mobile_chrome_driver'}
+    # Fixtures that can skip a test before it asks for a browser, so their
+    # tests don't make a profile worth booting ahead of time
+    GATE_FIXTURES = {'quick_page_public'}
+    
+    def __init__(self):
+        self._drivers = {}
+        self.profiles_needed = set()
+    
+    def _build_options(self, profile):
+        from selenium.webdriver.chrome.options import Options
+        
+        chrome_options = Options()
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--ignore-certificate-errors")
+        # Skip background work a throwaway test profile never needs
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-sync")
+        chrome_options.add_argument("--no-first-run")
+        # Return from get() at DOMContentLoaded; tests wait for the elements
+        # they need rather than for every subresource. Console checks wait for
+        # readyState 'complete' themselves so late errors are not missed
+        chrome_options.page_load_strategy = 'eager'
+        # Console checks only look at errors, so don't buffer anything quieter
+        chrome_options.set_capability('goog:loggingPrefs', {'browser': 'SEVERE'})
+        # Tests only inspect DOM and scripts, so skip downloading images
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2
+        })
+        if profile == 'mobile':
+            chrome_options.add_argument("--window-size=375,667")
+            chrome_options.add_experimental_option("mobileEmulation", {
+                "deviceName": "iPhone SE"
+            })
+        else:
+            chrome_options.add_argument("--disable-web-security")
+            chrome_options.add_argument("--allow-running-insecure-content")
+            chrome_options.add_argument("--window-size=1920,1080")
+        return chrome_options
+    
+    def _start(self, profile):
+        from selenium import webdriver
+        from selenium.common.exceptions import WebDriverException
+        from selenium.webdriver.chrome.service import Service
+        
+        driver_kwargs = {}
+        if CHROMEDRIVER_PATH:
+            driver_kwargs['service'] = Service(executable_path=CHROMEDRIVER_PATH)
+        try:
+            driver = webdriver.Chrome(options=self._build_options(profile), **driver_kwargs)
+        except WebDriverException:
+            return None
+        driver.set_page_load_timeout(30)
+        # Fonts and trackers add nothing the tests inspect, and skipping them
+        # lets console checks reach readyState 'complete' sooner
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        return driver
+    
+    def warm(self, profiles):
+        """Start every missing profile at once so their boot times overlap."""
+        missing = [profile for profile in profiles if profile not in self._drivers]
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            for profile, driver in zip(missing, executor.map(self._start, missing)):
+                self._drivers[profile] = driver
+    
+    def acquire(self, profile='desktop'):
+        """Return the driver for a profile, starting it on first use."""
+        if profile not in self._drivers:
+            # Boot the other profiles this run needs alongside it
+            self.warm({profile} | self.profiles_needed)
+        driver = self._drivers[profile]
+        if driver is None:
+            pytest.skip("Chrome browser not available for functional testing")
+        return driver
+    
+    def reset(self):
+        """Clear cookies, web storage and console logs left behind by the last test."""
+        from selenium.common.exceptions import WebDriverException
+        for driver in filter(None, self._drivers.values()):
+            try:
+                driver.delete_all_cookies()
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except WebDriverException:
+                # Storage is not reachable on some pages; fall back to a blank page
+                driver.get("about:blank")
+            # Reading the browser log drains it, so the next test's console
+            # checks only see its own entries
+            try:
+                driver.get_log('browser')
+            except WebDriverException:
+                pass
+    
+    def close(self):
+        """Quit every browser in the pool."""
+        for driver in filter(None, self._drivers.values()):
+            driver.quit()
+        self._drivers.clear()
+
+
+_browser_pool = BrowserPool()
+
+
+@pytest.fixture(scope='session')
+def browser_pool():
+    """Provide the session-wide browser pool and shut it down afterwards."""
+    yield _browser_pool
+    _browser_pool.close()
+
+
+@pytest.fixture
+def chrome_driver(browser_pool):
+    """Desktop headless Chrome from the shared pool."""
+    return browser_pool.acquire('desktop')
+
+
+@pytest.fixture
+def mobile_chrome_driver(browser_pool):
+    """Mobile-emulating headless Chrome from the shared pool."""
+    return browser_pool.acquire('mobile')
+
+
+@pytest.fixture
+def browser_login():
+    """Log a browser in through the app's login form.
+    
+    Returns a callable taking (driver, login_url, username, password) that
+    waits for the dashboard redirect.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    
+    def login(driver, login_url, username, password, timeout=10):
+        driver.get(login_url)
+        wait = WebDriverWait(driver, timeout, poll_frequency=0.1)
+        # Fill the form in one script call instead of per-keystroke send_keys
+        wait.until(EC.presence_of_element_located((By.NAME, "username")))
+        driver.execute_script(FILL_FORM_JS, {"username": username, "password": password})
+        driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+        wait.until(EC.url_contains("/dashboard"))
+    
+    return login
+
+
+@pytest.fixture
+def console_errors():
+    """Read a browser's SEVERE console entries once its page has loaded.
+    
+    Returns a callable taking (driver). Pooled browsers load pages eagerly,
+    so it waits for the load event first; otherwise errors from late scripts
+    and resources would be missed. Requests the pool blocks on purpose are
+    left out; any other blocked request still counts as an error.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    
+    def read_errors(driver, timeout=10):
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script("return document.readyState") == 'complete'
+        )
+        return [
+            entry for entry in driver.get_log('browser')
+            if entry['level'] == 'SEVERE' and not is_deliberately_blocked(entry)
+        ]
+    
+    return read_errors
+
+
+@pytest.fixture(autouse=True)
+def reset_browser_state():
+    """Reset pooled browsers after each test so tests stay independent."""
+    yield
+    _browser_pool.reset()
+
+
+def pytest_collection_finish(session):
+    """Record which browser profiles the selected tests will ask for.
+    
+    Nothing starts here: the first acquire() boots these together, so a run
+    whose browser tests all skip at their gate never launches Chrome.
+    """
+    if session.config.option.collectonly:
+        return
+    for item in session.items:
+        fixturenames = getattr(item, 'fixturenames', ())
+        if BrowserPool.GATE_FIXTURES.intersection(fixturenames):
+            continue
+        for profile, fixture_name in BrowserPool.PROFILE_FIXTURES.items():
+            if fixture_name in fixturenames:
+                _browser_pool.profiles_needed.add(profile)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Quit pooled browsers even if the browser_pool fixture never tore down."""
+    _browser_pool.close()
+
+
 def pytest_collection_modifyitems(config, items):
     """Modify test collection to add markers automatically."""
     for item in items:
@@ -4,41 +4,60 @@ End-to-end functional tests for location search functionality.
 
 import pytest
 import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from unittest.mock import patch
 
+QUICK_JOURNAL_URL = "https://journal.joshsisto.com/journal/quick"
+
+# Poll waits faster than the 0.5s default so they return soon after the
+# condition holds
+POLL_FREQUENCY = 0.1
+
+# Locators and wait conditions shared by the tests below
+SEARCH_INPUT = (By.ID, "location-search-input")
+SEARCH_BUTTON = (By.ID, "location-search-btn")
+CURRENT_LOCATION_BUTTON = (By.ID, "get-current-location")
+WAIT_SEARCH_INPUT = EC.presence_of_element_located(SEARCH_INPUT)
+
+# Time to first byte and to DOMContentLoaded for the current page, in ms
+NAVIGATION_TIMING_JS = """
+    const nav = performance.getEntriesByType('navigation')[0];
+    return {ttfb: nav.responseStart, dcl: nav.domContentLoadedEventEnd};
+"""
+
+
+@pytest.fixture(scope="module")
+def quick_page_public():
+    """Skip browser tests before any browser starts when the page needs a login."""
+    import requests
+    
+    # A plain HTTP probe answers this; navigating Chrome there just to see the
+    # redirect costs a browser start plus a full page load
+    response = requests.get(QUICK_JOURNAL_URL, timeout=10, allow_redirects=False)
+    if response.is_redirect and "login" in response.headers.get("Location", "").lower():
+        pytest.skip("Authentication required for this test")
+
 
 class TestLocationSearchE2E:
     """End-to-end tests for location search functionality."""
 
-    @pytest.fixture(scope="class")
-    def driver(self):
-        """Set up Chrome driver for testing."""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.set_page_load_timeout(30)
-        yield driver
-        driver.quit()
+    @pytest.fixture
+    def driver(self, quick_page_public, chrome_driver):
+        """Use the shared Chrome driver for testing."""
+        return chrome_driver
 
     @pytest.fixture
     def wait(self, driver):
         """Create WebDriverWait instance."""
-        return WebDriverWait(driver, 10)
+        return WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY)
 
     def test_location_search_elements_present(self, driver, wait):
         """Test that location search elements are present on the page."""
         # Navigate to quick journal page
-        driver.get("https://journal.joshsisto.com/journal/quick")
+        driver.get(QUICK_JOURNAL_URL)
         
         # Check if we're redirected to login (expected for unauthenticated user)
         if "login" in driver.current_url.lower():
@@ -46,102 +65,68 @@ class TestLocationSearchE2E:
         
         try:
             # Look for location search input
-            search_input = wait.until(
-                EC.presence_of_element_located((By.ID, "location-search-input"))
-            )
+            search_input = wait.until(WAIT_SEARCH_INPUT)
             assert search_input.is_displayed()
             assert search_input.get_attribute("placeholder")
             
             # Look for location search button
-            search_button = driver.find_element(By.ID, "location-search-btn")
+            search_button = driver.find_element(*SEARCH_BUTTON)
             assert search_button.is_displayed()
             
             # Look for current location button
-            current_location_btn = driver.find_element(By.ID, "get-current-location")
+            current_location_btn = driver.find_element(*CURRENT_LOCATION_BUTTON)
             assert current_location_btn.is_displayed()
             
         except TimeoutException:
             pytest.fail("Location search elements not found within timeout")
 
-    def test_location_search_input_validation(self, driver, wait):
-        """Test location search input validation."""
-        driver.get("https://journal.joshsisto.com/journal/quick")
-        
-        if "login" in driver.current_url.lower():
-            pytest.skip("Authentication required for this test")
-        
-        try:
-            search_input = wait.until(
-                EC.presence_of_element_located((By.ID, "location-search-input"))
-            )
-            search_button = driver.find_element(By.ID, "location-search-btn")
-            
-            # Test empty input
-            search_input.clear()
-            search_button.click()
-            
-            # Should show some kind of validation message
-            # (This would need to be verified based on actual implementation)
-            
-            # Test valid input
-            search_input.clear()
-            search_input.send_keys("New York")
-            search_button.click()
-            
-            # Should trigger search (verified by network activity or UI changes)
-            
-        except (TimeoutException, NoSuchElementException):
-            pytest.skip("Could not test location search validation")
-
     def test_location_search_javascript_loaded(self, driver):
         """Test that location search JavaScript is properly loaded."""
-        driver.get("https://journal.joshsisto.com/journal/quick")
+        driver.get(QUICK_JOURNAL_URL)
         
         if "login" in driver.current_url.lower():
             pytest.skip("Authentication required for this test")
         
-        # Check if LocationService is available
-        location_service_available = driver.execute_script(
-            "return typeof window.LocationService !== 'undefined' || typeof window.locationService !== 'undefined';"
-        )
-        
-        if not location_service_available:
-            # Wait a bit for dynamic loading
-            time.sleep(2)
-            location_service_available = driver.execute_script(
-                "return typeof window.LocationService !== 'undefined' || typeof window.locationService !== 'undefined';"
+        # Check if LocationService is available, polling briefly for dynamic
+        # loading instead of sleeping a fixed interval
+        try:
+            location_service_available = WebDriverWait(driver, 2, poll_frequency=POLL_FREQUENCY).until(
+                lambda d: d.execute_script(
+                    "return typeof window.LocationService !== 'undefined' || typeof window.locationService !== 'undefined';"
+                )
             )
+        except TimeoutException:
+            location_service_available = False
         
         # Note: This might be false if authentication is required
         # The test documents the expected behavior
         
-    def test_csrf_token_present(self, driver):
+    def test_csrf_token_present(self):
         """Test that CSRF token is available for API calls."""
-        driver.get("https://journal.joshsisto.com/journal/quick")
+        import re
+        import requests
         
-        if "login" in driver.current_url.lower():
-            pytest.skip("Authentication required for this test")
+        # The token is rendered server-side, so plain HTTP is enough to see it
+        response = requests.get(QUICK_JOURNAL_URL, timeout=10)
         
-        # Check if CSRF token is set
-        csrf_token = driver.execute_script("return window.csrfToken;")
+        if "login" in response.url.lower():
+            pytest.skip("Authentication required for this test")
         
-        if csrf_token:
-            assert isinstance(csrf_token, str)
-            assert len(csrf_token) > 0
+        match = re.search(r"window\.csrfToken = '([^']*)'", response.text)
+        assert match, "window.csrfToken should be set by the page"
+        assert len(match.group(1)) > 8
 
     def test_location_search_accessibility(self, driver, wait):
         """Test accessibility features of location search."""
-        driver.get("https://journal.joshsisto.com/journal/quick")
+        driver.get(QUICK_JOURNAL_URL)
         
         if "login" in driver.current_url.lower():
             pytest.skip("Authentication required for this test")
         
         try:
             # Check for proper labels and ARIA attributes
-            search_input = wait.until(
-                EC.presence_of_element_located((By.ID, "location-search-input"))
-            )
-            search_button = driver.find_element(By.ID, "location-search-btn")
+            search_input = wait.until(WAIT_SEARCH_INPUT)
+            search_button = driver.find_element(*SEARCH_BUTTON)
             
             # Check input has placeholder
             placeholder = search_input.get_attribute("placeholder")
@@ -157,15 +142,13 @@ class TestLocationSearchE2E:
 
     def test_enter_key_functionality(self, driver, wait):
         """Test that Enter key triggers location search."""
-        driver.get("https://journal.joshsisto.com/journal/quick")
+        driver.get(QUICK_JOURNAL_URL)
         
         if "login" in driver.current_url.lower():
             pytest.skip("Authentication required for this test")
         
         try:
-            search_input = wait.until(
-                EC.presence_of_element_located((By.ID, "location-search-input"))
-            )
+            search_input = wait.until(WAIT_SEARCH_INPUT)
             
             # Type in input and press Enter
             search_input.clear()
@@ -182,57 +165,76 @@ class TestLocationSearchE2E:
 class TestLocationSearchPerformance:
     """Performance tests for location search."""
     
+    LOAD_SAMPLES = 20
+    
     def test_location_js_load_time(self):
         """Test that location.js loads within reasonable time."""
         import requests
-        import time
+        import statistics
+        
+        url = "https://journal.joshsisto.com/static/js/location.js"
+        timings = [0.0] * self.LOAD_SAMPLES
+        errors = 0
+        
+        # Repeat the fetch over one keep-alive session and judge the tail,
+        # not a single noisy sample
+        with requests.Session() as session:
+            # Untimed warm-up pays DNS and the TLS handshake up front
+            session.head(url, allow_redirects=False, timeout=10)
+            
+            for i in range(self.LOAD_SAMPLES):
+                start_time = time.perf_counter()
+                response = session.get(url, timeout=10)
+                timings[i] = time.perf_counter() - start_time
+                if response.status_code != 200:
+                    errors += 1
+        
+        cuts = statistics.quantiles(timings, n=100)
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        print(f"location.js load: p50={p50:.3f}s p95={p95:.3f}s p99={p99:.3f}s "
+              f"mean={statistics.mean(timings):.3f}s errors={errors}")
+        
+        assert errors == 0
+        assert p95 < 2.0  # 95% of loads within 2 seconds
+        
+    def test_location_component_render_time(self, quick_page_public, chrome_driver):
+        """Test that location component renders quickly."""
+        chrome_driver.get(QUICK_JOURNAL_URL)
         
-        start_time = time.time()
-        response = requests.get("https://journal.joshsisto.com/static/js/location.js")
-        load_time = time.time() - start_time
+        if "login" in chrome_driver.current_url.lower():
+            pytest.skip("Authentication required for this test")
         
-        assert response.status_code == 200
-        assert load_time < 2.0  # Should load within 2 seconds
+        WebDriverWait(chrome_driver, 10, poll_frequency=POLL_FREQUENCY).until(WAIT_SEARCH_INPUT)
         
-    def test_location_component_render_time(self):
-        """Test that location component renders quickly."""
-        # This would measure the time it takes for the component to render
-        # In a real browser environment
-        pass
+        # Read the browser's own Navigation Timing entry so WebDriver round
+        # trips don't count towards the measurement (all values in ms)
+        timing = chrome_driver.execute_script(NAVIGATION_TIMING_JS)
+        print(f"quick journal: ttfb={timing['ttfb']:.0f}ms "
+              f"domContentLoaded={timing['dcl']:.0f}ms")
+        
+        assert timing['dcl'] > 0
+        assert timing['dcl'] < 3000  # Component markup ready within 3 seconds
 
 
 class TestLocationSearchMobile:
     """Mobile-specific tests for location search."""
     
     @pytest.fixture
-    def mobile_driver(self):
-        """Set up mobile Chrome driver."""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        
-        # Mobile viewport
-        chrome_options.add_argument("--window-size=375,667")
-        chrome_options.add_experimental_option("mobileEmulation", {
-            "deviceName": "iPhone SE"
-        })
-        
-        driver = webdriver.Chrome(options=chrome_options)
-        yield driver
-        driver.quit()
+    def mobile_driver(self, quick_page_public, mobile_chrome_driver):
+        """Use the pooled mobile Chrome driver."""
+        return mobile_chrome_driver
     
     def test_location_search_mobile_layout(self, mobile_driver):
         """Test location search layout on mobile devices."""
-        mobile_driver.get("https://journal.joshsisto.com/journal/quick")
+        mobile_driver.get(QUICK_JOURNAL_URL)
         
         if "login" in mobile_driver.current_url.lower():
             pytest.skip("Authentication required for this test")
         
         try:
             # Check if elements are visible and properly sized on mobile
-            search_input = mobile_driver.find_element(By.ID, "location-search-input")
-            search_button = mobile_driver.find_element(By.ID, "location-search-btn")
+            search_input = mobile_driver.find_element(*SEARCH_INPUT)
+            search_button = mobile_driver.find_element(*SEARCH_BUTTON)
             
             # Elements should be visible
             assert search_input.is_displayed()
@@ -5,55 +5,61 @@ Tests the JavaScript-based template loading system and user interactions.
 """
 
 import pytest
-import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import TimeoutException
+
+# Poll waits faster than the 0.5s default so they return soon after the
+# condition holds
+POLL_FREQUENCY = 0.1
+
+# Locators shared by the tests
+SUBMIT_BUTTON = (By.CSS_SELECTOR, "button[type='submit']")
+TEMPLATE_SELECT = (By.ID, "templateSelect")
+LOAD_TEMPLATE_BUTTON = (By.ID, "loadTemplateBtn")
+SUCCESS_ALERT = (By.CSS_SELECTOR, ".alert-success")
+
+# Cookie fields Network.setCookies accepts back from Network.getCookies
+COOKIE_PARAM_KEYS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
 
 
 class TestTemplateLoadingFunctional:
     """Functional tests for template loading interface."""
     
-    @pytest.fixture(scope="class")
-    def browser(self):
-        """Set up browser for functional testing."""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run headless for CI
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        try:
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.implicitly_wait(10)
-            yield driver
-        except WebDriverException:
-            pytest.skip("Chrome browser not available for functional testing")
-        finally:
-            if 'driver' in locals():
-                driver.quit()
+    @pytest.fixture
+    def browser(self, chrome_driver):
+        """Use the shared browser for functional testing."""
+        return chrome_driver
+    
+    @pytest.fixture(autouse=True)
+    def _use_browser_login(self, browser_login):
+        """Make the shared form login available to login_user."""
+        self.browser_login = browser_login
+    
+    # Session cookies from earlier logins, keyed by (base_url, username)
+    _session_cookies = {}
     
     def login_user(self, browser, base_url, username="testuser", password="TestPassword123!"):
-        """Helper to log in a user."""
-        browser.get(f"{base_url}/login")
-        
-        username_field = browser.find_element(By.NAME, "username")
-        password_field = browser.find_element(By.NAME, "password")
-        
-        username_field.send_keys(username)
-        password_field.send_keys(password)
-        
-        login_button = browser.find_element(By.CSS_SELECTOR, "button[type='submit']")
-        login_button.click()
-        
-        # Wait for redirect after login
-        WebDriverWait(browser, 10).until(
-            EC.url_contains("/dashboard")
-        )
+        """Helper to log in a user, reusing the session from an earlier login."""
+        saved_cookies = self._session_cookies.get((base_url, username))
+        if saved_cookies:
+            # CDP sets cookies for any origin, so no page load is needed first
+            browser.execute_cdp_cmd("Network.setCookies", {"cookies": saved_cookies})
+            return
+        
+        self.browser_login(browser, f"{base_url}/login", username, password)
+        
+        # Read the jar over CDP in one call; it keeps SameSite and the
+        # session flag that WebDriver's cookie dicts can drop
+        saved_cookies = []
+        for cookie in browser.execute_cdp_cmd("Network.getCookies", {"urls": [base_url]})["cookies"]:
+            cookie_param = {key: cookie[key] for key in COOKIE_PARAM_KEYS if key in cookie}
+            # Session cookies report expires=-1, which would restore them expired
+            if not cookie.get("session"):
+                cookie_param["expires"] = cookie["expires"]
+            saved_cookies.append(cookie_param)
+        self._session_cookies[(base_url, username)] = saved_cookies
     
     def test_template_selector_appears(self, browser, app, custom_template_with_questions, user):
         """Test that template selector appears on guided journal page."""
@@ -69,11 +75,11 @@ class TestTemplateLoadingFunctional:
         browser.get(f"{base_url}/journal/guided")
         
         # Check that template selector exists
-        template_select = browser.find_element(By.ID, "templateSelect")
+        template_select = browser.find_element(*TEMPLATE_SELECT)
         assert template_select is not None
         
         # Check that load button exists
-        load_button = browser.find_element(By.ID, "loadTemplateBtn")
+        load_button = browser.find_element(*LOAD_TEMPLATE_BUTTON)
         assert load_button is not None
         assert "Load" in load_button.text
     
@@ -86,8 +92,8 @@ class TestTemplateLoadingFunctional:
         
         browser.get(f"{base_url}/journal/guided")
         
-        template_select = Select(browser.find_element(By.ID, "templateSelect"))
-        load_button = browser.find_element(By.ID, "loadTemplateBtn")
+        template_select = Select(browser.find_element(*TEMPLATE_SELECT))
+        load_button = browser.find_element(*LOAD_TEMPLATE_BUTTON)
         
         # Initially should show "Load Default"
         assert "Default" in load_button.text
@@ -96,7 +102,7 @@ class TestTemplateLoadingFunctional:
         template_select.select_by_visible_text(custom_template_with_questions.name)
         
         # Wait for button text to update
-        WebDriverWait(browser, 5).until(
+        WebDriverWait(browser, 5, poll_frequency=POLL_FREQUENCY).until(
             lambda driver: custom_template_with_questions.name in load_button.text
         )
         
@@ -111,8 +117,8 @@ class TestTemplateLoadingFunctional:
         
         browser.get(f"{base_url}/journal/guided")
         
-        template_select = Select(browser.find_element(By.ID, "templateSelect"))
-        load_button = browser.find_element(By.ID, "loadTemplateBtn")
+        template_select = Select(browser.find_element(*TEMPLATE_SELECT))
+        load_button = browser.find_element(*LOAD_TEMPLATE_BUTTON)
         
         # Select template
         template_select.select_by_visible_text(custom_template_with_questions.name)
@@ -121,7 +127,7 @@ class TestTemplateLoadingFunctional:
         load_button.click()
         
         # Wait for page to load with template parameter
-        WebDriverWait(browser, 10).until(
+        WebDriverWait(browser, 10, poll_frequency=POLL_FREQUENCY).until(
             lambda driver: f"template_id={custom_template_with_questions.id}" in driver.current_url
         )
         
@@ -170,30 +176,30 @@ class TestTemplateLoadingFunctional:
         
         browser.get(f"{base_url}/journal/guided?template_id={custom_template_with_questions.id}")
         
-        # Fill out template questions
-        # Number question (rating slider)
-        rating_slider = browser.find_element(By.CSS_SELECTOR, "input[type='range']")
-        browser.execute_script("arguments[0].value = 8; arguments[0].dispatchEvent(new Event('input'));", rating_slider)
-        
-        # Text question
-        text_areas = browser.find_elements(By.CSS_SELECTOR, "textarea")
-        if text_areas:
-            text_areas[0].send_keys("This was a great day!")
-        
-        # Boolean question (Yes/No radio)
-        yes_radio = browser.find_element(By.CSS_SELECTOR, "input[type='radio'][value='Yes']")
-        yes_radio.click()
+        # Fill out template questions (rating slider, first text question and
+        # Yes/No radio) in one round trip
+        browser.execute_script("""
+            const slider = document.querySelector("input[type='range']");
+            slider.value = 8;
+            slider.dispatchEvent(new Event('input'));
+            const textArea = document.querySelector('textarea');
+            if (textArea) {
+                textArea.value = 'This was a great day!';
+                textArea.dispatchEvent(new Event('input', {bubbles: true}));
+            }
+            document.querySelector("input[type='radio'][value='Yes']").click();
+        """)
         
         # Submit the form
-        submit_button = browser.find_element(By.CSS_SELECTOR, "button[type='submit']")
+        submit_button = browser.find_element(*SUBMIT_BUTTON)
         submit_button.click()
         
         # Wait for success message
-        WebDriverWait(browser, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".alert-success"))
+        WebDriverWait(browser, 10, poll_frequency=POLL_FREQUENCY).until(
+            EC.presence_of_element_located(SUCCESS_ALERT)
         )
         
-        success_message = browser.find_element(By.CSS_SELECTOR, ".alert-success")
+        success_message = browser.find_element(*SUCCESS_ALERT)
         assert "success" in success_message.text.lower()
 
 
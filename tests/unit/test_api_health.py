@@ -0,0 +1,27 @@
+"""
+Unit tests for the health check API endpoint.
+"""
+
+from unittest.mock import patch
+from sqlalchemy.exc import OperationalError
+from models import db
+
+
+class TestHealthAPI:
+    """Test the unauthenticated /api/health endpoint."""
+
+    def test_health_reports_ok(self, client):
+        """Test the endpoint answers without a login when the database is reachable."""
+        response = client.get('/api/health')
+
+        assert response.status_code == 200
+        assert response.get_json() == {'status': 'ok', 'database': True}
+
+    def test_health_reports_database_failure(self, client):
+        """Test a database error turns into a 503 rather than a server error."""
+        error = OperationalError('SELECT 1', {}, Exception('database is down'))
+        with patch.object(db.session, 'execute', side_effect=error):
+            response = client.get('/api/health')
+
+        assert response.status_code == 503
+        assert response.get_json()['database'] is False
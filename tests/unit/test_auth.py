@@ -180,6 +180,16 @@ class TestLogin:
         response_text = response.get_data(as_text=True)
         assert 'Invalid username or password' in response_text or 'Login failed' in response_text
     
+    def test_login_unknown_username_checks_dummy_hash(self, client):
+        """Test the login route pays for a hash check on unknown usernames."""
+        with patch('services.user_service.check_password_hash', return_value=False) as check:
+            client.post('/login', data={
+                'username': 'nonexistent',
+                'password': 'TestPassword123!'
+            })
+        
+        check.assert_called_once()
+    
     def test_login_invalid_password(self, client, user):
         """Test login fails with invalid password."""
         response = client.post('/login', data={
@@ -399,7 +409,14 @@ class TestAuthenticationHelpers:
             reset_token = user.generate_reset_token()
             assert reset_token is not None
             assert user.verify_reset_token(reset_token)
-    
+
+    def test_reset_token_stored_hashed(self, app, user):
+        """Test reset token is not stored in plain text."""
+        with app.app_context():
+            reset_token = user.generate_reset_token()
+            assert user.reset_token != reset_token
+            assert not user.verify_reset_token(user.reset_token)
+
     def test_user_repr(self, user):
         """Test User model string representation."""
         repr_str = repr(user)
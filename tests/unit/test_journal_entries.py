@@ -100,6 +100,32 @@ class TestQuickJournalEntry:
         assert len(entry.photos) == 1
         assert entry.photos[0].filename.endswith('.jpg')
     
+    def test_photo_over_size_limit_is_discarded(self, tmp_path):
+        """Test the upload copy enforces the size limit on the bytes received."""
+        from io import BytesIO
+        from services.journal_service import _save_photo_stream, PHOTO_COPY_BUFFER_SIZE
+        
+        photo_path = tmp_path / 'photo.jpg'
+        oversized = BytesIO(b'x' * (2 * PHOTO_COPY_BUFFER_SIZE + 1))
+        assert _save_photo_stream(oversized, str(photo_path), 2 * PHOTO_COPY_BUFFER_SIZE) is None
+        assert not photo_path.exists()
+        
+        assert _save_photo_stream(BytesIO(b'fake image data'), str(photo_path), 2 * PHOTO_COPY_BUFFER_SIZE) == 15
+        assert photo_path.read_bytes() == b'fake image data'
+    
+    def test_photo_copy_failure_removes_partial_file(self, tmp_path):
+        """Test a failed upload copy does not leave a partial file behind."""
+        from unittest.mock import MagicMock
+        from services.journal_service import _save_photo_stream, PHOTO_COPY_BUFFER_SIZE
+        
+        photo_path = tmp_path / 'photo.jpg'
+        stream = MagicMock()
+        stream.read.side_effect = [b'partial data', ConnectionResetError('client went away')]
+        
+        with pytest.raises(ConnectionResetError):
+            _save_photo_stream(stream, str(photo_path), 2 * PHOTO_COPY_BUFFER_SIZE)
+        assert not photo_path.exists()
+    
     def test_create_quick_entry_empty_content(self, client, logged_in_user):
         """Test creating quick entry with empty content."""
         data = {
@@ -275,6 +301,14 @@ class TestGuidedJournalEntry:
         assert entry is not None
         assert tag in entry.tags
     
+    def test_quick_and_guided_tag_ids_parse_alike(self, app, db_session, user, tag):
+        """Test both entry types resolve submitted tag IDs with the same rules."""
+        from services.journal_service import _select_user_tags
+        
+        submitted = [f' {tag.id}', str(tag.id), 'abc', None, '999999']
+        assert _select_user_tags(user.id, submitted) == [tag]
+        assert _select_user_tags(user.id, []) == []
+    
     def test_create_guided_entry_invalid_feeling_scale(self, client, logged_in_user):
         """Test creating guided entry with invalid feeling scale."""
         data = {
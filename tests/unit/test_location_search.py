@@ -42,7 +42,7 @@ class TestWeatherService:
         assert hasattr(service, 'geocode_location')
         assert hasattr(service, 'get_weather_by_coordinates')
 
-    @patch('services.weather_service.requests.get')
+    @patch('services.weather_service.requests.Session.get')
     def test_geocode_location_success(self, mock_get):
         """Test successful location geocoding."""
         # Mock successful API response
@@ -64,7 +64,7 @@ class TestWeatherService:
         assert result == (40.7128, -74.0060)
         mock_get.assert_called_once()
 
-    @patch('services.weather_service.requests.get')
+    @patch('services.weather_service.requests.Session.get')
     def test_geocode_location_no_results(self, mock_get):
         """Test geocoding when no results found."""
         # Mock empty results
@@ -78,7 +78,7 @@ class TestWeatherService:
         
         assert result is None
 
-    @patch('services.weather_service.requests.get')
+    @patch('services.weather_service.requests.Session.get')
     def test_geocode_location_api_error(self, mock_get):
         """Test geocoding when API returns error."""
         # Mock API error
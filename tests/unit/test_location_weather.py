@@ -7,7 +7,7 @@ Tests location tagging, weather integration, and related features.
 import pytest
 import json
 from unittest.mock import patch, MagicMock
-from models import db, Location, WeatherData, JournalEntry, User
+from models import db, Location, WeatherData, JournalEntry, User, geohash_prefix_end
 from services.weather_service import WeatherService
 
 
@@ -154,7 +154,7 @@ class TestWeatherService:
         assert service.geo_url == "http://api.openweathermap.org/geo/1.0"
         assert service.cache_duration.total_seconds() == 30 * 60  # 30 minutes
     
-    @patch('services.weather_service.requests.get')
+    @patch('services.weather_service.requests.Session.get')
     def test_geocode_location_success(self, mock_get):
         """Test successful location geocoding."""
         # Mock API response
@@ -175,7 +175,7 @@ class TestWeatherService:
         assert coordinates == (40.7128, -74.0060)
         mock_get.assert_called_once()
     
-    @patch('services.weather_service.requests.get')
+    @patch('services.weather_service.requests.Session.get')
     def test_reverse_geocode_success(self, mock_get):
         """Test successful reverse geocoding."""
         # Mock API response
@@ -217,6 +217,25 @@ class TestWeatherService:
             assert location.longitude == -74.0060
             assert location.location_type == 'gps'
     
+    @patch('services.weather_service.requests.Session.get')
+    def test_weather_fetch_reverse_geocodes_once_when_lookup_fails(self, mock_get, app, db_session):
+        """Test that a failed reverse geocode prefetch is not repeated when saving."""
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = {'main': {'temp': 70.0}, 'weather': [{'main': 'Clear'}]}
+        mock_get.return_value = mock_response
+        
+        service = WeatherService()
+        service.api_key = 'test_key'
+        
+        with patch.object(service, '_reverse_geocode_uncached', return_value=None) as mock_reverse:
+            weather_data = service.get_weather_by_coordinates(40.7128, -74.0060, use_cache=False)
+        
+        assert weather_data['temperature'] == 70.0
+        mock_reverse.assert_called_once_with(40.7128, -74.0060)
+        location = Location.query.filter_by(latitude=40.7128, longitude=-74.0060).one()
+        assert location.location_type == 'gps'
+    
     def test_get_user_recent_locations(self, app, db_session, user):
         """Test getting user's recent locations."""
         # Create test locations and entries
@@ -237,6 +256,42 @@ class TestWeatherService:
         
         assert len(recent_locations) == 2
         assert recent_locations[0].name in ['Location 1', 'Location 2']
+    
+    def test_cached_weather_found_across_geohash_cell_edge(self, app, db_session):
+        """Test that cached weather just over a geohash cell boundary is reused."""
+        # 40.7385 falls in cell dr5rg, the lookup point 40.737 in dr5re
+        location = Location(name='Edge Location', latitude=40.7385, longitude=-74.006)
+        weather = WeatherData(temperature=20.0, weather_condition='Clear', location=location)
+        db_session.add(weather)
+        db_session.commit()
+        
+        assert location.geohash.startswith('dr5rg')
+        
+        service = WeatherService()
+        assert service._get_cached_weather(40.737, -74.006) == weather
+    
+    def test_geohash_prefix_end_bounds_prefix_range(self):
+        """Test the range upper bound skips unused letters and carries past 'z'."""
+        assert geohash_prefix_end('dr5re') == 'dr5rf'
+        assert geohash_prefix_end('dr5r9') == 'dr5rb'
+        assert geohash_prefix_end('dr5rz') == 'dr5s'
+        assert geohash_prefix_end('zz') is None
+    
+    def test_geocode_cache_evicts_least_recently_used(self):
+        """Test that the geocode cache stays capped and keeps recently read entries."""
+        service = WeatherService()
+        service.geocode_cache_max_size = 2
+        
+        service._cache_geocode(('geocode', 'new york'), (40.7128, -74.0060))
+        service._cache_geocode(('geocode', 'boston'), (42.3601, -71.0589))
+        # Reading New York makes Boston the least recently used entry
+        assert service._get_cached_geocode(('geocode', 'new york')) == (40.7128, -74.0060)
+        service._cache_geocode(('geocode', 'chicago'), (41.8781, -87.6298))
+        
+        assert len(service._geocode_cache) == 2
+        assert service._get_cached_geocode(('geocode', 'boston')) is None
+        assert service._get_cached_geocode(('geocode', 'new york')) == (40.7128, -74.0060)
+        assert service._get_cached_geocode(('geocode', 'chicago')) == (41.8781, -87.6298)
 
 
 class TestLocationWeatherJournalIntegration:
@@ -462,6 +517,24 @@ class TestLocationWeatherSecurity:
                              json={'location_name': 'Test'})
         assert response.status_code == 302  # Redirect to login
     
+    @patch('services.weather_service.weather_service.geocode_location', return_value=None)
+    def test_location_search_handles_hostile_input(self, mock_geocode, client, logged_in_user):
+        """Test location search rejects or safely handles hostile input."""
+        payloads = [
+            "",
+            "<script>alert('xss')</script>",
+            "'; DROP TABLE locations; --",
+            "A" * 1000,
+        ]
+        
+        for payload in payloads:
+            response = client.post('/api/location/search',
+                                 json={'location_name': payload},
+                                 headers={'Content-Type': 'application/json'})
+            
+            assert response.status_code < 500, f"Server error for payload {payload[:40]!r}"
+            assert b"<script>alert" not in response.data
+    
     def test_weather_api_requires_authentication(self, client):
         """Test that weather API requires authentication."""
         response = client.post('/api/weather/current',
@@ -525,14 +598,15 @@ class TestLocationWeatherEdgeCases:
             'location_name': 'Location 2'
         }
         
-        location_id1, _ = _handle_location_and_weather(form_data1)
+        location1, _ = _handle_location_and_weather(form_data1)
+        db_session.add(location1)
         db_session.commit()
         
-        location_id2, _ = _handle_location_and_weather(form_data2)
+        location2, _ = _handle_location_and_weather(form_data2)
         db_session.commit()
         
         # Should reuse the same location for nearby coordinates
-        assert location_id1 == location_id2
+        assert location1.id == location2.id
     
     def test_weather_service_without_api_key(self):
         """Test weather service behavior without API key."""
@@ -557,11 +631,9 @@ class TestLocationWeatherEdgeCases:
         }
         
         # Should not crash and should create location without coordinates
-        location_id, weather_id = _handle_location_and_weather(form_data)
-        db_session.commit()
+        location, weather = _handle_location_and_weather(form_data)
         
-        if location_id:
-            location = Location.query.get(location_id)
+        if location:
             assert location.latitude is None
             assert location.longitude is None
             assert location.location_type == 'manual'
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Unit tests for tag management routes.
+
+Tests listing and deleting tags.
+"""
+
+import pytest
+from unittest.mock import patch
+from models import JournalEntry, Tag, db
+
+
+class TestDeleteTag:
+    """Test deleting tags."""
+    
+    def test_delete_tag_removes_from_entries(self, client, logged_in_user, journal_entry, tag):
+        """Test deleting a tag removes it from all entries."""
+        journal_entry.tags.append(tag)
+        db.session.commit()
+        tag_id = tag.id
+        entry_id = journal_entry.id
+        
+        response = client.post(f'/tags/{tag_id}/delete', follow_redirects=True)
+        
+        assert response.status_code == 200
+        assert b'Tag deleted successfully' in response.data
+        
+        # Tag and its associations should be gone, entry should remain
+        assert db.session.get(Tag, tag_id) is None
+        db.session.refresh(journal_entry)
+        assert db.session.get(JournalEntry, entry_id) is not None
+        assert len(journal_entry.tags) == 0
+    
+    def test_delete_other_users_tag(self, client, logged_in_user, user_no_email, db_session):
+        """Test cannot delete another user's tag."""
+        other_tag = Tag(name='other-tag', color='#007bff', user_id=user_no_email.id)
+        db_session.add(other_tag)
+        db_session.commit()
+        
+        response = client.post(f'/tags/{other_tag.id}/delete')
+        
+        assert response.status_code == 404
+        assert db.session.get(Tag, other_tag.id) is not None
+    
+    def test_delete_tag_error_flashes_danger(self, client, logged_in_user, tag):
+        """Test a failed delete keeps the tag and shows a danger alert."""
+        with patch.object(db.session, 'commit', side_effect=Exception('database unavailable')):
+            response = client.post(f'/tags/{tag.id}/delete')
+        
+        assert response.status_code == 302
+        with client.session_transaction() as session:
+            assert ('danger', 'Error deleting tag. Please try again.') in session['_flashes']
+        assert db.session.get(Tag, tag.id) is not None
+    
+    def test_delete_tag_requires_login(self, client, tag):
+        """Test deleting a tag requires authentication."""
+        response = client.post(f'/tags/{tag.id}/delete')
+        
+        assert response.status_code == 302
+        assert '/login' in response.location
+        assert db.session.get(Tag, tag.id) is not None
@@ -0,0 +1,130 @@
+"""
+Unit tests for the user service.
+
+Tests registration conflict handling and authentication timing for unknown
+usernames.
+"""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+from sqlalchemy.exc import IntegrityError
+from models import User, db
+from services import user_service
+from services.user_service import register_user, authenticate_user
+
+
+def make_integrity_error(message, constraint_name=None):
+    """Build an IntegrityError shaped like the one the DB driver raises."""
+    orig = Exception(message)
+    if constraint_name is not None:
+        orig.diag = SimpleNamespace(constraint_name=constraint_name)
+    return IntegrityError('INSERT INTO users ...', {}, orig)
+
+
+class TestRegisterUser:
+    """Test register_user against the users table constraints."""
+
+    def test_register_inserts_user(self, app, db_session):
+        """Test registration inserts the row and returns the new user."""
+        username = f'newuser_{uuid.uuid4().hex[:8]}'
+        with patch('services.user_service.send_email'):
+            new_user, message = register_user(username, f'{username}@example.com', 'TestPassword123!', 'UTC')
+
+        assert new_user is not None
+        assert new_user.id is not None
+        assert new_user in db.session
+        assert 'Registration successful' in message
+
+        stored = db.session.get(User, new_user.id)
+        assert stored.username == username
+        assert stored.email == f'{username}@example.com'
+        assert stored.check_password('TestPassword123!')
+        assert stored.email_verification_token is not None
+        assert stored.is_email_verified is False
+
+    def test_register_duplicate_username(self, app, db_session, user):
+        """Test a username collision is reported as such."""
+        new_user, message = register_user(user.username, None, 'TestPassword123!', 'UTC')
+
+        assert new_user is None
+        assert message == 'Username already exists.'
+
+    def test_register_duplicate_email(self, app, db_session, user):
+        """Test an email collision is reported as such."""
+        username = f'newuser_{uuid.uuid4().hex[:8]}'
+        new_user, message = register_user(username, user.email, 'TestPassword123!', 'UTC')
+
+        assert new_user is None
+        assert message == 'Email already registered.'
+        assert User.query.filter_by(username=username).first() is None
+
+    def test_register_other_integrity_error(self, app, db_session):
+        """Test an IntegrityError that is not a duplicate account is not misreported."""
+        error = make_integrity_error('null value in column "password_hash"', 'users_password_hash_not_null')
+        with patch.object(db.session, 'commit', side_effect=error):
+            new_user, message = register_user('someone_new', None, 'TestPassword123!', 'UTC')
+
+        assert new_user is None
+        assert message.startswith('Registration error')
+        assert 'already' not in message
+
+
+class TestConflictingUserColumn:
+    """Test mapping IntegrityErrors to the users column that caused them."""
+
+    def test_postgres_constraint_names(self):
+        """Test PostgreSQL errors are matched on the constraint name."""
+        email_error = make_integrity_error('duplicate key value violates unique constraint "users_email_key"', 'users_email_key')
+        username_error = make_integrity_error('duplicate key value violates unique constraint "users_username_key"', 'users_username_key')
+
+        assert user_service._conflicting_user_column(email_error) == 'email'
+        assert user_service._conflicting_user_column(username_error) == 'username'
+
+    def test_constraint_name_wins_over_message(self):
+        """Test a message that merely mentions email does not count as an email conflict."""
+        error = make_integrity_error('Key (username)=(email) already exists.', 'users_username_key')
+        assert user_service._conflicting_user_column(error) == 'username'
+
+    def test_sqlite_messages(self):
+        """Test SQLite errors fall back to the reported column."""
+        assert user_service._conflicting_user_column(
+            make_integrity_error('UNIQUE constraint failed: users.email')) == 'email'
+        assert user_service._conflicting_user_column(
+            make_integrity_error('UNIQUE constraint failed: users.username')) == 'username'
+
+    def test_unrelated_error(self):
+        """Test other integrity errors map to no column."""
+        assert user_service._conflicting_user_column(
+            make_integrity_error('NOT NULL constraint failed: users.password_hash')) is None
+        assert user_service._conflicting_user_column(
+            make_integrity_error('check violation', 'users_timezone_check')) is None
+
+
+class TestAuthenticateUser:
+    """Test authenticate_user password checks and timing behaviour."""
+
+    def test_every_login_checks_the_password_hash(self, app, db_session, user):
+        """Test repeated successful logins each pay for a full password check."""
+        with patch.object(User, 'check_password', autospec=True, side_effect=lambda u, p: p == 'TestPassword123!') as check:
+            assert authenticate_user(user.username, 'TestPassword123!') == user
+            assert authenticate_user(user.username, 'TestPassword123!') == user
+
+        assert check.call_count == 2
+
+    def test_password_change_takes_effect(self, app, db_session, user):
+        """Test the old password stops working once the stored hash changes."""
+        assert authenticate_user(user.username, 'TestPassword123!') == user
+
+        user.set_password('NewPassword456!')
+        db.session.commit()
+
+        assert authenticate_user(user.username, 'TestPassword123!') is None
+        assert authenticate_user(user.username, 'NewPassword456!') == user
+
+    def test_unknown_username_checks_dummy_hash(self, app, db_session):
+        """Test unknown usernames still pay for one password hash check."""
+        with patch('services.user_service.check_password_hash', return_value=False) as check:
+            assert authenticate_user(f'nobody_{uuid.uuid4().hex[:8]}', 'TestPassword123!') is None
+
+        check.assert_called_once_with(user_service._get_dummy_hash(), 'TestPassword123!')
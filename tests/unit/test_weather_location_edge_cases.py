@@ -87,6 +87,22 @@ class TestWeatherLocationEdgeCases:
         # Should reuse the same location
         assert entry_1.location_id == entry_2.location_id
     
+    def test_manual_location_deduplication_ignores_case(self, app, db_session, user):
+        """Test that manual locations differing only in case are deduplicated."""
+        entry_1 = create_quick_entry_simple(user.id, {
+            'content': 'First entry',
+            'location_name': 'Springfield',
+            'location_state': 'IL'
+        })
+        entry_2 = create_quick_entry_simple(user.id, {
+            'content': 'Second entry',
+            'location_name': 'springfield',
+            'location_state': 'il'
+        })
+        
+        assert entry_1.location_id is not None
+        assert entry_1.location_id == entry_2.location_id
+    
     def test_large_coordinate_values(self, app, db_session, user):
         """Test handling of extreme coordinate values."""
         form_data = {
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark password hashing and suggest a PASSWORD_HASH_METHOD setting.
+
+Finds the PBKDF2 iteration count that takes roughly the target time on this
+machine so the cost can be pinned in the environment instead of relying on
+library defaults.
+
+Usage:
+    python3 tune_password_hash.py [target_ms]
+"""
+
+import sys
+import time
+from werkzeug.security import generate_password_hash
+
+DEFAULT_TARGET_MS = 250
+MIN_ITERATIONS = 100000
+
+
+def time_hash(method: str) -> float:
+    """Return the time in milliseconds to hash a password with the given method."""
+    start = time.perf_counter()
+    generate_password_hash('benchmark-password', method=method)
+    return (time.perf_counter() - start) * 1000
+
+
+def tune_iterations(target_ms: float) -> int:
+    """Find the PBKDF2-SHA256 iteration count closest to the target time."""
+    iterations = MIN_ITERATIONS
+    elapsed = time_hash(f'pbkdf2:sha256:{iterations}')
+    
+    # Hashing time scales linearly with iterations, so one measurement
+    # gives a good estimate; refine once to absorb warm-up noise
+    for _ in range(2):
+        iterations = max(MIN_ITERATIONS, int(iterations * target_ms / elapsed))
+        elapsed = time_hash(f'pbkdf2:sha256:{iterations}')
+    
+    return iterations
+
+
+def main():
+    """Main entry point."""
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TARGET_MS
+    
+    print(f"Tuning password hashing for ~{target_ms:.0f}ms per hash...")
+    iterations = tune_iterations(target_ms)
+    method = f'pbkdf2:sha256:{iterations}'
+    elapsed = time_hash(method)
+    
+    print(f"  {method}: {elapsed:.0f}ms")
+    print()
+    print("Add this line to your .env file:")
+    print(f"PASSWORD_HASH_METHOD={method}")
+
+
+if __name__ == "__main__":
+    main()